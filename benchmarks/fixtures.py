@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+import os
+import random
+import typing
+import zipfile
+
+import click
+
+# Small, deterministic synthetic versions of the data files, in the formats of the real ones. The blocks include the
+# blocks of the random characters, a CJK block named by Unihan and a Hangul block named by hangul.txt.
+
+BLOCKS = [
+    (0x0000, 0x007F, "Basic Latin"),
+    (0x0180, 0x024F, "Latin Extended-B"),
+    (0x0250, 0x02AF, "IPA Extensions"),
+    (0x0370, 0x03FF, "Greek and Coptic"),
+    (0x0400, 0x04FF, "Cyrillic"),
+    (0x0700, 0x074F, "Syriac"),
+    (0x0900, 0x097F, "Devanagari"),
+    (0x2190, 0x21FF, "Arrows"),
+    (0x2200, 0x22FF, "Mathematical Operators"),
+    (0x4E00, 0x5DFF, "CJK Unified Ideographs"),
+    (0xAC00, 0xB7FF, "Hangul Syllables"),
+    (0x1F0A0, 0x1F0FF, "Playing Cards"),
+    (0x1F600, 0x1F64F, "Emoticons"),
+    (0x1F680, 0x1F6FF, "Transport and Map Symbols"),
+]
+CJK_BLOCK = 0x4E00
+HANGUL_BLOCK = 0xAC00
+
+WORDS = [
+    "ALPHA",
+    "ARROW",
+    "BAR",
+    "CAPITAL",
+    "CIRCLE",
+    "COMBINING",
+    "DOUBLE",
+    "DOWN",
+    "FACE",
+    "HOOK",
+    "LEFT",
+    "LETTER",
+    "LIGATURE",
+    "MARK",
+    "OPERATOR",
+    "RIGHT",
+    "SIGN",
+    "SMALL",
+    "STROKE",
+    "SYMBOL",
+    "TAIL",
+    "TILDE",
+    "UP",
+    "WITH",
+]
+ASSIGNED_RATIO = 0.8
+SUBBLOCK_SIZE = 32
+
+
+def _name(rng: random.Random, block_name: str) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(1, 4))]
+    return " ".join([block_name.upper()] + words)
+
+
+def write_fixtures(data_dir: str, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    os.makedirs(data_dir, exist_ok=True)
+    assigned: typing.List[int] = []
+
+    with open(os.path.join(data_dir, "Blocks.txt"), "w", encoding="utf-8") as f:
+        f.write("# Blocks.txt (synthetic)\n\n")
+        for range_from, range_to, name in BLOCKS:
+            f.write(f"{range_from:04X}..{range_to:04X}; {name}\n")
+
+    with open(os.path.join(data_dir, "NamesList.txt"), "w", encoding="utf-8") as f:
+        f.write("@@@\tThe Unicode Standard (synthetic)\n")
+        for range_from, range_to, name in BLOCKS:
+            f.write(f"@@\t{range_from:04X}\t{name}\t{range_to:04X}\n")
+            if range_from in (CJK_BLOCK, HANGUL_BLOCK):
+                continue
+            for code in range(range_from, range_to + 1):
+                if (code - range_from) % SUBBLOCK_SIZE == 0:
+                    f.write(f"@\t\t{name} part {(code - range_from) // SUBBLOCK_SIZE + 1}\n")
+                if rng.random() > ASSIGNED_RATIO:
+                    continue
+                assigned.append(code)
+                f.write(f"{code:04X}\t{_name(rng, name)}\n")
+                if rng.random() < 0.2:
+                    f.write(f"\t= {_name(rng, name).lower()}\n")
+                if rng.random() < 0.2:
+                    f.write(f"\t* see also {rng.choice(assigned):04X}\n")
+                if rng.random() < 0.2:
+                    related = rng.choice(assigned)
+                    f.write(f"\tx (related character - {related:04X})\n")
+                if rng.random() < 0.1:
+                    f.write(f"\tx {rng.choice(assigned):04X}\n")
+
+    with open(os.path.join(data_dir, "confusables.txt"), "w", encoding="utf-8-sig") as f:
+        f.write("# confusables.txt (synthetic)\n\n")
+        for _ in range(len(assigned) // 10):
+            f.write(f"{rng.choice(assigned):04X} ;\t{rng.choice(assigned):04X} ;\tMA\t# synthetic\n")
+        for _ in range(len(assigned) // 50):
+            targets = " ".join(f"{rng.choice(assigned):04X}" for _ in range(rng.randint(2, 4)))
+            f.write(f"{rng.choice(assigned):04X} ;\t{targets} ;\tMA\t# synthetic\n")
+
+    with open(os.path.join(data_dir, "CaseFolding.txt"), "w", encoding="utf-8") as f:
+        f.write("# CaseFolding.txt (synthetic)\n\n")
+        for code in range(0x41, 0x5B):
+            f.write(f"{code:04X}; C; {code + 0x20:04X}; # LATIN CAPITAL LETTER {chr(code)}\n")
+        for code in range(0x0410, 0x0430):
+            f.write(f"{code:04X}; C; {code + 0x20:04X}; # CYRILLIC CAPITAL LETTER\n")
+
+    readings = ["# Unihan_Readings.txt (synthetic)\n\n"]
+    for code in range(CJK_BLOCK, CJK_BLOCK + 0x1000):
+        readings.append(f"U+{code:04X}\tkMandarin\tyī\n")
+        readings.append(f"U+{code:04X}\tkDefinition\t{' '.join(rng.choice(WORDS).lower() for _ in range(3))}\n")
+    with zipfile.ZipFile(os.path.join(data_dir, "Unihan.zip"), "w", zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr("Unihan_Readings.txt", "".join(readings))
+
+    with open(os.path.join(data_dir, "hangul.txt"), "w", encoding="utf-8") as f:
+        f.write("# index-euc-kr.txt (synthetic)\n\n")
+        for index, code in enumerate(range(HANGUL_BLOCK, HANGUL_BLOCK + 0x800)):
+            f.write(f"{index:6d}\t0x{code:04X}\t{chr(code)} (HANGUL SYLLABLE {rng.choice(WORDS)})\n")
+
+    with open(os.path.join(data_dir, "wikipedia.html"), "w", encoding="utf-8") as f:
+        f.write("<table>\n")
+        for range_from, range_to, name in BLOCKS:
+            title = f"{name} (Unicode block)"
+            f.write("<tr>\n")
+            f.write(f'<td data-sort-value="{range_from:04X}">U+{range_from:04X}..U+{range_to:04X}</td>\n')
+            f.write(f'<td><a href="/wiki/{title.replace(" ", "_")}" title="{title}">{name}</a></td>\n')
+            f.write("</tr>\n")
+        f.write("</table>\n")
+
+
+@click.command()
+@click.option("-o", "--out", required=True, type=click.Path(file_okay=False))
+@click.option("-s", "--seed", default=0)
+def main(out: str, seed: int) -> None:
+    write_fixtures(out, seed)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import time
+import typing
+import zipfile
+
+import click
+
+from fixtures import write_fixtures  # type: ignore
+from unicode import parsers
+from unicode.uinfo import Dataset, UInfo
+
+# pylint: disable=protected-access
+
+
+def _nameslist(data_dir: str) -> typing.Callable[[], typing.Any]:
+    data = Dataset()
+    UInfo._load_blocks(data, os.path.join(data_dir, "Blocks.txt"))
+    return lambda: UInfo._load_nameslist(data, os.path.join(data_dir, "NamesList.txt"))
+
+
+def _blocks(data_dir: str) -> typing.Callable[[], typing.Any]:
+    return lambda: UInfo._load_blocks(Dataset(), os.path.join(data_dir, "Blocks.txt"))
+
+
+# file type -> (file name, zip member, setup returning the parser call)
+BENCHMARKS: typing.Dict[
+    str, typing.Tuple[str, typing.Optional[str], typing.Callable[[str], typing.Callable[[], typing.Any]]]
+] = {
+    "blocks": ("Blocks.txt", None, _blocks),
+    "nameslist": ("NamesList.txt", None, _nameslist),
+    "confusables": (
+        "confusables.txt",
+        None,
+        lambda data_dir: lambda: parsers.parse_confusables(os.path.join(data_dir, "confusables.txt")),
+    ),
+    "casefolding": (
+        "CaseFolding.txt",
+        None,
+        lambda data_dir: lambda: parsers.parse_casefolding(os.path.join(data_dir, "CaseFolding.txt")),
+    ),
+    "unihan": (
+        "Unihan.zip",
+        "Unihan_Readings.txt",
+        lambda data_dir: lambda: parsers.parse_unihan(os.path.join(data_dir, "Unihan.zip"), "Unihan_Readings.txt"),
+    ),
+    "hangul": ("hangul.txt", None, lambda data_dir: lambda: parsers.parse_hangul(os.path.join(data_dir, "hangul.txt"))),
+    "wikipedia": (
+        "wikipedia.html",
+        None,
+        lambda data_dir: lambda: parsers.parse_wikipedia(os.path.join(data_dir, "wikipedia.html")),
+    ),
+}
+
+
+def count_lines(file_name: str, member: typing.Optional[str]) -> int:
+    if member is None:
+        with open(file_name, "rb") as f:
+            return f.read().count(b"\n")
+    with zipfile.ZipFile(file_name, "r") as zip_file:
+        return zip_file.read(member).count(b"\n")
+
+
+@click.command()
+@click.option(
+    "-d", "--data-dir", type=click.Path(exists=True, file_okay=False), help="full data set (default: fixtures)"
+)
+@click.option("-n", "--repeat", default=5, help="runs per parser; the fastest one is reported")
+def main(data_dir: typing.Optional[str], repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as fixtures_dir:
+        if data_dir is None:
+            write_fixtures(fixtures_dir)
+        run_benchmarks(data_dir or fixtures_dir, repeat)
+
+
+def run_benchmarks(data_dir: str, repeat: int) -> None:
+    for name, (file_name, member, setup) in BENCHMARKS.items():
+        lines = count_lines(os.path.join(data_dir, file_name), member)
+        best = None
+        for _ in range(repeat):
+            run = setup(data_dir)
+            start_time = time.perf_counter()
+            run()
+            elapsed_time = time.perf_counter() - start_time
+            best = elapsed_time if best is None else min(best, elapsed_time)
+        assert best is not None
+        click.echo(f"{name:12} {lines:9d} lines {1000 * best:9.1f} ms {lines / best:12.0f} lines/s")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+
+import functools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import typing
+
+import click
+
+from fixtures import write_fixtures  # type: ignore
+from unicode import datasets, parsers
+from unicode.app import cache, flask_app
+from unicode.loader import Dataset, load_blocks, load_nameslist, merge_secondary
+from unicode.search import NameIndex
+from unicode.skeleton import Watchlist
+from unicode.snapshot import read_snapshot, source_key
+from unicode.suggest import SuggestIndex
+from unicode.summaries import WikipediaSummaries
+from unicode.uinfo import UInfo
+
+ResultT = typing.Dict[str, typing.Any]
+
+SEARCH_QUERIES = ["A", "U+0041", "arrow", "latin letter", "capital with hook", "smal leter", "cjk"]
+
+
+def measure(func: typing.Callable[[], typing.Any], repeat: int, number: int = 1) -> ResultT:
+    # times `number` calls of `func` `repeat` times; reports seconds per call
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start_time) / number)
+    return {"unit": "s", "min": min(times), "median": statistics.median(times), "repeat": repeat, "number": number}
+
+
+def load_stages(data_dir: str, repeat: int) -> typing.Dict[str, ResultT]:
+    def path(file_name: str) -> str:
+        return os.path.join(data_dir, file_name)
+
+    results = {}
+    results["load.blocks"] = measure(lambda: load_blocks(Dataset(), path("Blocks.txt")), repeat)
+
+    data = Dataset()
+    load_blocks(data, path("Blocks.txt"))
+    results["load.nameslist"] = measure(lambda: load_nameslist(data, path("NamesList.txt")), repeat)
+    results["load.confusables"] = measure(lambda: parsers.parse_confusables(path("confusables.txt")), repeat)
+    results["load.casefolding"] = measure(lambda: parsers.parse_casefolding(path("CaseFolding.txt")), repeat)
+    results["load.unihan"] = measure(lambda: parsers.parse_unihan(path("Unihan.zip"), "Unihan_Readings.txt"), repeat)
+    results["load.hangul"] = measure(lambda: parsers.parse_hangul(path("hangul.txt")), repeat)
+    results["load.wikipedia"] = measure(lambda: parsers.parse_wikipedia(path("wikipedia.html")), repeat)
+
+    builder = load_nameslist(data, path("NamesList.txt"))
+    parsed = {
+        "confusables": parsers.parse_confusables(path("confusables.txt")),
+        "casefolding": parsers.parse_casefolding(path("CaseFolding.txt")),
+        "unihan": parsers.parse_unihan(path("Unihan.zip"), "Unihan_Readings.txt"),
+        "hangul": parsers.parse_hangul(path("hangul.txt")),
+        "wikipedia": parsers.parse_wikipedia(path("wikipedia.html")),
+    }
+    merge_secondary(data, builder, parsed)
+    results["load.build_store"] = measure(builder.build, repeat)
+    store = builder.build()
+    results["load.name_index"] = measure(lambda: NameIndex(store), repeat)
+    results["load.suggest_index"] = measure(lambda: SuggestIndex(store, data.blocks.by_id), repeat)
+
+    results["load.total"] = measure(lambda: UInfo().load(data_dir), repeat)
+    # until ready to serve; the secondary datasets are loaded in the background
+    lazy: typing.List[UInfo] = []
+
+    def load_core() -> None:
+        lazy.append(UInfo())
+        lazy[-1].load(data_dir, lazy=True)
+
+    results["load.core"] = measure(load_core, repeat)
+    for uinfo in lazy:
+        uinfo.wait_complete()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snapshot_file = os.path.join(tmp_dir, "uinfo.snapshot")
+        full = UInfo()
+        full.load(data_dir)
+        key = source_key(data_dir)
+        results["snapshot.write"] = measure(lambda: full.save_snapshot(snapshot_file), repeat)
+        full.save_snapshot(snapshot_file)
+        results["snapshot.read"] = measure(lambda: read_snapshot(snapshot_file, key), repeat)
+        results["load.total_snapshot"] = measure(lambda: UInfo().load(data_dir, snapshot_file), repeat)
+    return results
+
+
+def queries(uinfo: UInfo, repeat: int) -> typing.Dict[str, ResultT]:
+    results = {}
+    codes = [info.codepoint_id() for info in uinfo.get_random_char_infos(100)]
+    results["lookup.codepoint"] = measure(lambda: [uinfo.get_codepoint(code) for code in codes], repeat, 10)
+    results["lookup.codepoint_info"] = measure(lambda: [uinfo.get_codepoint_info(code) for code in codes], repeat, 10)
+    results["lookup.block_infos"] = measure(uinfo.blocks().get_block_infos, repeat, 100)
+    results["lookup.random_chars"] = measure(lambda: uinfo.get_random_char_infos(32), repeat, 100)
+    names = [info.name() for info in uinfo.get_random_char_infos(100)]
+    results["skeleton.strings"] = measure(lambda: uinfo.confusables().skeletons(names), repeat, 100)
+    watchlist = Watchlist(uinfo.confusables(), names[:50])
+    results["skeleton.screen"] = measure(lambda: watchlist.screen(names), repeat, 100)
+    results["casefold.strings"] = measure(lambda: uinfo.case_folding().fold_all(names), repeat, 100)
+    names_search = uinfo.names()
+    for query in SEARCH_QUERIES:
+        results[f"search.direct[{query}]"] = measure(functools.partial(names_search.search_direct, query), repeat, 10)
+        results[f"search.by_name[{query}]"] = measure(
+            functools.partial(names_search.search_by_name, query, 100), repeat
+        )
+        results[f"search.fuzzy[{query}]"] = measure(functools.partial(names_search.search_fuzzy, query, 100), repeat)
+        results[f"suggest[{query}]"] = measure(functools.partial(names_search.suggest, query, 10), repeat, 10)
+    return results
+
+
+def rendering(data_dir: str, repeat: int) -> typing.Dict[str, ResultT]:
+    # renders through the test client with caching disabled and without fetching wikipedia summaries
+    unicode_info = datasets.unicode_info
+    unicode_info.load(data_dir)
+    unicode_info.set_wikipedia_summaries(WikipediaSummaries(fetch=lambda topic: ""))
+    cache.init_app(flask_app, config={"CACHE_TYPE": "null", "CACHE_NO_NULL_WARNING": True})
+    client = flask_app.test_client()
+    block = unicode_info.blocks().get_block_infos()[0]
+    codes = [info.url() for info in unicode_info.get_random_char_infos(10)]
+
+    def get(*urls: str) -> None:
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == 200, url
+
+    results = {}
+    results["render.code"] = measure(lambda: get(*codes), repeat)
+    results["render.block"] = measure(lambda: get(block.url()), repeat)
+    results["render.welcome"] = measure(lambda: get("/"), repeat)
+    results["render.sitemap"] = measure(lambda: get("/sitemap.txt"), repeat)
+    results["render.search"] = measure(lambda: client.post("/search", data={"q": "arrow"}), repeat)
+    return results
+
+
+def run_suite(data_dir: str, repeat: int) -> typing.Dict[str, ResultT]:
+    results = load_stages(data_dir, repeat)
+    uinfo = UInfo()
+    uinfo.load(data_dir)
+    results.update(queries(uinfo, repeat))
+    results.update(rendering(data_dir, repeat))
+    return results
+
+
+def _commit() -> typing.Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], check=True, capture_output=True, text=True, cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: typing.Dict[str, ResultT], baseline: typing.Dict[str, ResultT]) -> None:
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["min"], result["min"]
+        ratio = after / before if before > 0 else float("inf")
+        marker = " <-- slower" if ratio > 1.2 else (" faster" if ratio < 0.8 else "")
+        click.echo(f"{name:40} {1000 * before:10.3f} ms -> {1000 * after:10.3f} ms {ratio:6.2f}x{marker}")
+
+
+@click.command()
+@click.option(
+    "-d", "--data-dir", type=click.Path(exists=True, file_okay=False), help="full data set (default: fixtures)"
+)
+@click.option("-n", "--repeat", default=5)
+@click.option("-o", "--output", type=click.Path(dir_okay=False), help="write the results as JSON")
+@click.option(
+    "-c", "--compare", "baseline_file", type=click.Path(exists=True, dir_okay=False), help="JSON to compare to"
+)
+def main(
+    data_dir: typing.Optional[str], repeat: int, output: typing.Optional[str], baseline_file: typing.Optional[str]
+) -> None:
+    with tempfile.TemporaryDirectory() as fixtures_dir:
+        if data_dir is None:
+            write_fixtures(fixtures_dir)
+        results = run_suite(data_dir or fixtures_dir, repeat)
+
+    report = {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "data": "fixtures" if data_dir is None else os.path.abspath(data_dir),
+        "repeat": repeat,
+        "results": results,
+    }
+    if output is not None:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if baseline_file is not None:
+        with open(baseline_file, encoding="utf-8") as f:
+            compare(results, json.load(f)["results"])
+    else:
+        for name, result in results.items():
+            click.echo(f"{name:40} {1000 * result['min']:10.3f} ms (median {1000 * result['median']:10.3f} ms)")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -2,3 +2,23 @@ BASE_URL = '''http://localhost:5000'''
 META = '''<!-- some tags for the header (e.g. host validation hashes) -->'''
 BOTTOM = '''<!-- some html to put at the bottom (e.g. tracking) -->'''
 # CACHE_DIR = "your/cache/dir"
+# SNAPSHOT_FILE = "your/cache/dir/uinfo.snapshot"
+# WIKIPEDIA_TTL = 7 * 24 * 3600
+# WIKIPEDIA_API_URL = "http://en.wikipedia.org/w/api.php"
+# WIKIPEDIA_WAIT = 10 * 60  # seconds render-static waits for the summaries
+# RESPONSE_CACHE = "sqlite"  # shared by all workers; "simple": per worker
+# RESPONSE_CACHE_FILE = "your/cache/dir/responses.sqlite"
+# RESPONSE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# RESPONSE_CACHE_TIMEOUT = 0  # seconds; 0: until the dataset changes
+# HTTP_MAX_AGE = {"show_code": 24 * 3600, "show_block": 3600, "sitemap": 24 * 3600, "robots": 24 * 3600}
+# LOAD_JOBS = 4  # processes parsing the data files (default: number of CPUs, at most one per file)
+# DATA_URLS = {"Blocks.txt": "http://localhost:8000/{version}/Blocks.txt"}  # override download urls (e.g. a local
+#     mirror); "{version}" is replaced by the unicode version, urls without it only apply to the default version
+# METRICS = True  # Prometheus metrics of the serving process at /metrics (default: disabled)
+# LAZY_LOAD = True  # serve once blocks and names list are loaded; the other data files are parsed by LOAD_JOBS workers
+# RELOAD_SIGNAL = "SIGHUP"  # reloads the dataset from CACHE_DIR/SNAPSHOT_FILE without downtime (default: disabled)
+# ADMIN_TOKEN = "some secret"  # enables POST /admin/reload (header "Authorization: Bearer <token>")
+# UNICODE_VERSIONS = ["12.1.0"]  # further versions served at /v/<version>/c/... (data in CACHE_DIR/unicode-<version>)
+# API_BATCH_LIMIT = 10000  # codepoints per POST /api/codepoints request
+# API_ANALYZE_LIMIT = 100000  # characters per POST /api/analyze request
+# WATCHLIST_FILE = "your/watchlist.txt"  # default watchlist of POST /api/screen, one entry per line
@@ -0,0 +1,34 @@
+import pathlib
+import typing
+
+import pytest
+from flask.testing import FlaskClient
+
+from benchmarks.fixtures import write_fixtures
+from unicode import app, datasets
+from unicode.summaries import WikipediaSummaries
+from unicode.uinfo import UInfo
+
+
+@pytest.fixture(name="data_dir", scope="session")
+def fixture_data_dir(tmp_path_factory: pytest.TempPathFactory) -> pathlib.Path:
+    # the synthetic data files of the benchmarks
+    data_dir = tmp_path_factory.mktemp("data")
+    write_fixtures(str(data_dir))
+    return data_dir
+
+
+@pytest.fixture(name="uinfo", scope="session")
+def fixture_uinfo(data_dir: pathlib.Path) -> typing.Iterator[UInfo]:
+    uinfo = UInfo()
+    uinfo.load(str(data_dir))
+    yield uinfo
+
+
+@pytest.fixture(name="client", scope="session")
+def fixture_client(data_dir: pathlib.Path) -> FlaskClient:
+    # the app serving the fixtures, with caching disabled and without fetching wikipedia summaries
+    datasets.unicode_info.load(str(data_dir))
+    datasets.unicode_info.set_wikipedia_summaries(WikipediaSummaries(fetch=lambda topic: ""))
+    app.cache.init_app(app.flask_app, config={"CACHE_TYPE": "null", "CACHE_NO_NULL_WARNING": True})
+    return app.flask_app.test_client()
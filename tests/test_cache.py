@@ -0,0 +1,65 @@
+import pathlib
+import pickle
+
+from unicode.cache import EVICTION_TARGET, SqliteCache
+
+MAX_BYTES = 100_000
+
+
+def _cache(tmp_path: pathlib.Path) -> SqliteCache:
+    return SqliteCache(str(tmp_path / "cache.sqlite"), max_bytes=MAX_BYTES, default_timeout=0)
+
+
+def _total_size(cache: SqliteCache) -> int:
+    # pylint: disable=protected-access
+    connection = cache._connection()
+    total = connection.execute("SELECT value FROM meta WHERE name = 'size'").fetchone()[0]
+    assert total == connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    return int(total)
+
+
+def test_eviction_stops_at_target(tmp_path: pathlib.Path) -> None:
+    cache = _cache(tmp_path)
+    value = b"x" * 1000
+    for index in range(300):
+        assert cache.set(f"key{index:03}", value)
+        assert _total_size(cache) <= MAX_BYTES
+    entry_size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)) + len("key000")
+    target = int(MAX_BYTES * EVICTION_TARGET)
+    # the last eviction removed only as many entries as needed to get down to the target
+    assert target - entry_size < _total_size(cache) <= MAX_BYTES
+    # least recently used entries were evicted, the most recent one is kept
+    assert not cache.has("key000")
+    assert cache.get("key299") == value
+
+
+def test_eviction_keeps_recently_used(tmp_path: pathlib.Path) -> None:
+    cache = _cache(tmp_path)
+    for index in range(95):
+        cache.set(f"key{index:03}", b"x" * 1000)
+    # pylint: disable=protected-access
+    cache._connection().execute("UPDATE entries SET accessed = accessed + 1000 WHERE key = 'key000'")
+    for index in range(95, 120):
+        cache.set(f"key{index:03}", b"x" * 1000)
+    assert cache.has("key000")
+    assert not cache.has("key001")
+
+
+def test_stored_entry_is_not_evicted(tmp_path: pathlib.Path) -> None:
+    cache = _cache(tmp_path)
+    for index in range(50):
+        cache.set(f"key{index:03}", b"x" * 1000)
+    # the entry being stored is the least recently used one, but must survive its own eviction
+    # pylint: disable=protected-access
+    cache._connection().execute("UPDATE entries SET accessed = accessed + 1000")
+    assert cache.set("key000", b"y" * 80_000)
+    assert cache.get("key000") == b"y" * 80_000
+    assert _total_size(cache) <= MAX_BYTES
+
+
+def test_oversized_entry_is_refused(tmp_path: pathlib.Path) -> None:
+    cache = _cache(tmp_path)
+    cache.set("small", 1)
+    assert not cache.set("large", b"x" * MAX_BYTES)
+    assert not cache.has("large")
+    assert cache.get("small") == 1
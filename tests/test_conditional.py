@@ -0,0 +1,28 @@
+import pytest
+from flask.testing import FlaskClient
+
+
+@pytest.mark.parametrize("url", ["/c/0041", "/b/0000", "/sitemap.txt"])
+def test_not_modified(client: FlaskClient, url: str) -> None:
+    response = client.get(url)
+    assert response.status_code == 200
+    etag, weak = response.get_etag()
+    assert etag and not weak
+    assert response.cache_control.public
+
+    for if_none_match in [f'"{etag}"', f'W/"{etag}"', f'"other", "{etag}"']:
+        response = client.get(url, headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304, if_none_match
+        assert response.get_etag() == (etag, False)
+        assert not response.data
+
+    response = client.get(url, headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
+def test_star_tag(client: FlaskClient) -> None:
+    # "*" matches any existing representation, but must not turn a missing one into 304
+    assert client.get("/c/0080", headers={"If-None-Match": "*"}).status_code == 404
+    assert client.get("/b/0080", headers={"If-None-Match": "*"}).status_code == 404
+    response = client.get("/c/0041", headers={"If-None-Match": "*"})
+    assert response.status_code == 200 and response.get_etag()[0]
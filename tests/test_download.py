@@ -0,0 +1,175 @@
+import http.server
+import logging
+import os
+import pathlib
+import threading
+import typing
+
+import pytest
+import requests
+from pyftpdlib.authorizers import DummyAuthorizer  # type: ignore
+from pyftpdlib.handlers import FTPHandler  # type: ignore
+from pyftpdlib.servers import FTPServer  # type: ignore
+
+from unicode.download import data_files, download, fetch_data_files
+
+
+class _DataServer(http.server.BaseHTTPRequestHandler):
+    # serves state["files"] (path -> content) with etags, honoring If-None-Match; state["status"] overrides the status
+    state: typing.Dict[str, typing.Any] = {}
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        self.state["requests"].append((self.path, self.headers.get("if-none-match")))
+        content = self.state["files"].get(self.path)
+        etag = f'"{hash(content)}"'
+        if self.state["status"] != 200 or content is None:
+            self.send_error(self.state["status"] if content is not None else 404)
+        elif self.headers.get("if-none-match") == etag:
+            self.send_response(304)
+            self.end_headers()
+        else:
+            self.send_response(200)
+            self.send_header("etag", etag)
+            # a truncated response announces more bytes than it sends
+            self.send_header("content-length", str(len(content) + (10 if self.state["truncate"] else 0)))
+            self.end_headers()
+            self.wfile.write(content)
+
+    def log_message(self, *args: typing.Any) -> None:  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture(name="server")
+def fixture_server() -> typing.Iterator[typing.Dict[str, typing.Any]]:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _DataServer)
+    server.daemon_threads = True
+    _DataServer.state = {
+        "url": f"http://127.0.0.1:{server.server_address[1]}",
+        "files": {"/data.txt": b"version 1\n"},
+        "requests": [],
+        "status": 200,
+        "truncate": False,
+    }
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield _DataServer.state
+    server.shutdown()
+    server.server_close()
+
+
+def test_not_modified(server: typing.Dict[str, typing.Any], tmp_path: pathlib.Path) -> None:
+    file_name = str(tmp_path / "data.txt")
+    entry = download(f"{server['url']}/data.txt", file_name)
+    assert pathlib.Path(file_name).read_bytes() == b"version 1\n"
+    assert entry["size"] == 10 and entry["etag"] is not None
+
+    os.utime(file_name, (0, 0))
+    # the file is hashed again, as its modification time changed
+    assert download(f"{server['url']}/data.txt", file_name, entry, refresh=True) == dict(entry, mtime_ns=0)
+    # the conditional request was answered by 304, so the file was not written again
+    assert server["requests"][-1] == ("/data.txt", entry["etag"])
+    assert os.path.getmtime(file_name) == 0
+
+
+def test_changed(server: typing.Dict[str, typing.Any], tmp_path: pathlib.Path) -> None:
+    file_name = str(tmp_path / "data.txt")
+    entry = download(f"{server['url']}/data.txt", file_name)
+    server["files"]["/data.txt"] = b"version 2, longer\n"
+    new_entry = download(f"{server['url']}/data.txt", file_name, entry, refresh=True)
+    assert pathlib.Path(file_name).read_bytes() == b"version 2, longer\n"
+    assert new_entry["sha256"] != entry["sha256"] and new_entry["size"] == 18
+
+    # without refresh, only a locally modified file is downloaded again
+    assert download(f"{server['url']}/data.txt", file_name, new_entry) == new_entry
+    pathlib.Path(file_name).write_bytes(b"modified")
+    assert download(f"{server['url']}/data.txt", file_name, new_entry) == dict(
+        new_entry, mtime_ns=os.stat(file_name).st_mtime_ns
+    )
+    assert pathlib.Path(file_name).read_bytes() == b"version 2, longer\n"
+
+
+@pytest.mark.parametrize("failure", ["status", "truncated", "unreachable"])
+def test_failed_refresh_keeps_file(
+    server: typing.Dict[str, typing.Any], tmp_path: pathlib.Path, caplog: pytest.LogCaptureFixture, failure: str
+) -> None:
+    file_name = str(tmp_path / "data.txt")
+    url = f"{server['url']}/data.txt"
+    entry = download(url, file_name)
+    server["files"]["/data.txt"] = b"version 2\n"
+    if failure == "status":
+        server["status"] = 503
+    elif failure == "truncated":
+        server["truncate"] = True
+    else:
+        url = "http://127.0.0.1:9/data.txt"
+        entry["url"] = url
+    with caplog.at_level(logging.WARNING):
+        assert download(url, file_name, entry, refresh=True) == entry
+    assert "keeping the cached file" in caplog.text
+    assert pathlib.Path(file_name).read_bytes() == b"version 1\n"
+    assert os.listdir(tmp_path) == ["data.txt"]
+
+
+def test_failed_download(server: typing.Dict[str, typing.Any], tmp_path: pathlib.Path) -> None:
+    server["truncate"] = True
+    with pytest.raises(requests.RequestException):
+        download(f"{server['url']}/data.txt", str(tmp_path / "data.txt"))
+    # the partial download has been removed
+    assert not os.listdir(tmp_path)
+
+
+def test_fetch_data_files(server: typing.Dict[str, typing.Any], tmp_path: pathlib.Path) -> None:
+    cache_dir = str(tmp_path / "cache")
+    urls = {target: f"{server['url']}/{target}" for target in data_files()}
+    server["files"] = {f"/{target}": target.encode("utf-8") for target in data_files()}
+    fetch_data_files(cache_dir, False, urls)
+    assert sorted(os.listdir(cache_dir)) == sorted([*data_files(), "downloads.json"])
+
+    # refreshing with an unavailable server keeps all cached files
+    server["status"] = 500
+    fetch_data_files(cache_dir, True, urls)
+
+    # missing files are still required
+    os.remove(os.path.join(cache_dir, "Blocks.txt"))
+    with pytest.raises(RuntimeError, match="failed to download data files"):
+        fetch_data_files(cache_dir, True, urls)
+
+
+@pytest.fixture(name="ftp_dir")
+def fixture_ftp_dir(tmp_path: pathlib.Path) -> typing.Iterator[typing.Tuple[str, pathlib.Path]]:
+    root = tmp_path / "ftp"
+    root.mkdir()
+    authorizer = DummyAuthorizer()
+    authorizer.add_anonymous(str(root))
+    handler = type("Handler", (FTPHandler,), {"authorizer": authorizer})
+    server = FTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"timeout": 0.1, "handle_exit": False}, daemon=True)
+    thread.start()
+    yield f"ftp://127.0.0.1:{server.address[1]}", root
+    server.close_all()
+    thread.join()
+
+
+def test_ftp(ftp_dir: typing.Tuple[str, pathlib.Path], tmp_path: pathlib.Path) -> None:
+    url, root = ftp_dir
+    (root / "data.txt").write_bytes(b"version 1\n")
+    os.utime(root / "data.txt", (1_000_000_000, 1_000_000_000))
+    file_name = str(tmp_path / "data.txt")
+    entry = download(f"{url}/data.txt", file_name)
+    assert pathlib.Path(file_name).read_bytes() == b"version 1\n"
+    assert entry["last_modified"] is not None
+
+    # the modification time is unchanged, so the file is not transferred again
+    (root / "data.txt").write_bytes(b"version 2\n")
+    os.utime(root / "data.txt", (1_000_000_000, 1_000_000_000))
+    assert download(f"{url}/data.txt", file_name, entry, refresh=True) == entry
+    assert pathlib.Path(file_name).read_bytes() == b"version 1\n"
+
+    os.utime(root / "data.txt", (1_100_000_000, 1_100_000_000))
+    new_entry = download(f"{url}/data.txt", file_name, entry, refresh=True)
+    assert pathlib.Path(file_name).read_bytes() == b"version 2\n"
+    assert new_entry["last_modified"] != entry["last_modified"]
+
+    # a missing file on the server is a failed refresh
+    (root / "data.txt").unlink()
+    assert download(f"{url}/data.txt", file_name, new_entry, refresh=True) == new_entry
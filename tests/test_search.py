@@ -0,0 +1,131 @@
+import typing
+
+import pytest
+from flask.testing import FlaskClient
+
+from benchmarks.fixtures import CJK_BLOCK
+from unicode.codepoint import CodepointInfo
+from unicode import search
+from unicode.search import DEPRIORITIZED_BLOCKS
+from unicode.uinfo import UInfo
+
+QUERIES = ["arrow", "Arrow Up", "latin letter", "row", "capital with hook", "up symbol", "syllable", "<unassigned>"]
+
+
+@pytest.fixture(name="ranked_names", scope="module")
+def fixture_ranked_names(uinfo: UInfo) -> typing.List[typing.Tuple[int, int, int, str]]:
+    # (rank, deprioritized, codepoint, upper case name) of all codepoints, in the order of the search results
+    names = []
+    for code in range(0x110000):
+        info = uinfo.get_codepoint_info(code)
+        if info is None:
+            continue
+        block = uinfo.blocks().get_block_info_of(code)
+        deprioritized = block is not None and block.block_id() in DEPRIORITIZED_BLOCKS
+        name = info.name()
+        names.append((10 * len(name) if deprioritized else len(name), 1 if deprioritized else 0, code, name.upper()))
+    return sorted(names)
+
+
+def _baseline(ranked_names: typing.List[typing.Tuple[int, int, int, str]], query: str) -> typing.List[int]:
+    # the linear scan of the original search: all codepoints whose name contains all keywords
+    keywords = query.upper().split()
+    return [code for _, _, code, name in ranked_names if all(keyword in name for keyword in keywords)]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_keyword_search(uinfo: UInfo, ranked_names: typing.List[typing.Tuple[int, int, int, str]], query: str) -> None:
+    expected = _baseline(ranked_names, query)
+    assert expected
+    matches, message = uinfo.names().search_by_name(query, len(expected))
+    assert [info.codepoint_id() for info in matches] == expected
+    assert message is None
+
+    # with a lower limit, the best matches are returned
+    matches, message = uinfo.names().search_by_name(query, 10)
+    assert [info.codepoint_id() for info in matches] == expected[:10]
+    assert message == (f"Showing the best 10 of {len(expected)} matches" if len(expected) > 10 else None)
+
+
+def test_direct_search(uinfo: UInfo) -> None:
+    for query in ["A", " A ", "U+0041", "u+41", "+0041", "0041", "41"]:
+        matches, message = uinfo.names().search_by_name(query, 10)
+        assert [info.codepoint_id() for info in matches] == [0x41], query
+        assert message in ("Direct character match.", "Direct codepoint match.")
+    assert uinfo.names().search_direct("  ") == ([], "Empty query :(")
+    # unknown codepoints are searched by name
+    assert uinfo.names().search_direct("U+0080") == ([], "No direct match")
+    assert uinfo.names().search_by_name("U+0080", 10) == ([], None)
+
+
+@pytest.mark.parametrize("query", ["arrow", "letter", "up"])
+def test_cursor_paging(uinfo: UInfo, query: str) -> None:
+    expected, next_cursor, total = uinfo.names().search_ranked(query, 100000)
+    assert next_cursor is None and len(expected) == total
+    matches: typing.List[CodepointInfo] = []
+    cursor = None
+    while True:
+        page, cursor, page_total = uinfo.names().search_ranked(query, 7, cursor)
+        assert page_total == total
+        matches.extend(page)
+        if cursor is None:
+            break
+        assert len(page) == 7
+    # the pages follow each other without overlaps or gaps
+    assert [info.codepoint_id() for info in matches] == [info.codepoint_id() for info in expected]
+
+
+def test_cjk_ranked_down(uinfo: UInfo) -> None:
+    matches, _, _ = uinfo.names().search_ranked("up", 100000)
+    cjk = [CJK_BLOCK <= info.codepoint_id() <= 0x9FFF for info in matches]
+    assert any(cjk) and not all(cjk)
+    # the ideographs follow all other characters, even those with longer names
+    assert cjk == sorted(cjk)
+    lengths = [len(info.name()) for info in matches]
+    assert min(lengths[cjk.index(True) :]) < max(lengths[: cjk.index(True)])
+
+
+def test_api_search(client: FlaskClient, uinfo: UInfo) -> None:
+    expected, _, total = uinfo.names().search_ranked("letter", 100000)
+    assert total > 100
+    codes: typing.List[int] = []
+    response = client.get("/api/search", query_string={"q": "letter"})
+    while True:
+        assert response.status_code == 200
+        assert response.json is not None and response.json["total"] == total
+        codes.extend(int(result["codepoint"][2:], 16) for result in response.json["results"])
+        if response.json["next_cursor"] is None:
+            break
+        response = client.get("/api/search", query_string={"q": "letter", "cursor": response.json["next_cursor"]})
+    assert codes == [info.codepoint_id() for info in expected]
+
+    response = client.get("/api/search", query_string={"q": "U+0041"})
+    assert response.json is not None and response.json["total"] == 1 and response.json["next_cursor"] is None
+
+
+@pytest.mark.parametrize("cursor", ["x", "!!!", "MSwy", "YSxiLGM="])
+def test_api_search_bad_cursor(client: FlaskClient, cursor: str) -> None:
+    response = client.get("/api/search", query_string={"q": "letter", "cursor": cursor})
+    assert response.status_code == 400
+    assert response.json is not None and "invalid cursor" in response.json["error"]
+
+
+@pytest.mark.parametrize(
+    "query, words",
+    [("smal leter", ["SMALL", "LETTER"]), ("arow", ["ARROW"]), ("capitl ligatre", ["CAPITAL", "LIGATURE"])],
+)
+def test_typo_recovery(uinfo: UInfo, query: str, words: typing.List[str]) -> None:
+    matches, message = uinfo.names().search_by_name(query, 20)
+    assert len(matches) == 20
+    assert message == "No exact matches, showing similar names."
+    for info in matches:
+        assert all(word in info.name().upper().split() for word in words), info.name()
+
+
+def test_fuzzy_search_bounds(uinfo: UInfo, monkeypatch: pytest.MonkeyPatch) -> None:
+    expected = [info.codepoint_id() for info in uinfo.names().search_fuzzy("leter", 5)]
+    # the postings are ordered by rank, so the best matches are found within a small budget
+    monkeypatch.setattr(search, "FUZZY_MAX_POSTINGS", 10)
+    assert [info.codepoint_id() for info in uinfo.names().search_fuzzy("leter", 5)] == expected
+    assert not uinfo.names().search_fuzzy("leter" * 20, 5)
+    assert uinfo.names().search_by_name("qxzj", 5) == ([], None)
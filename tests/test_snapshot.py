@@ -0,0 +1,28 @@
+import json
+import os
+import pathlib
+
+from unicode.download import DOWNLOAD_MANIFEST_TARGET
+from unicode.snapshot import SOURCE_FILES, source_key
+
+
+def test_source_key_uses_manifest(tmp_path: pathlib.Path) -> None:
+    for file_name in SOURCE_FILES:
+        (tmp_path / file_name).write_text(file_name, encoding="utf-8")
+    key = source_key(str(tmp_path))
+
+    # while size and modification time match the manifest, its sha256 is used instead of reading the file
+    manifest = {}
+    for file_name in SOURCE_FILES:
+        stat = os.stat(tmp_path / file_name)
+        manifest[file_name] = {"sha256": "0" * 64, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    (tmp_path / DOWNLOAD_MANIFEST_TARGET).write_text(json.dumps(manifest), encoding="utf-8")
+    manifest_key = source_key(str(tmp_path))
+    assert manifest_key != key
+
+    # a modified file is hashed again
+    os.utime(tmp_path / SOURCE_FILES[0], ns=(0, 0))
+    assert source_key(str(tmp_path)) not in (key, manifest_key)
+    for file_name in SOURCE_FILES:
+        os.utime(tmp_path / file_name, ns=(0, 0))
+    assert source_key(str(tmp_path)) == key
@@ -0,0 +1,92 @@
+import typing
+
+from unicode.store import CodepointStore, CodepointStoreBuilder
+from unicode.uinfo import UInfo
+
+
+def _build() -> CodepointStore:
+    builder = CodepointStoreBuilder()
+    builder.add_block(0x10, 0x1F)
+    builder.add_block(0x30, 0x3F)
+    codepoint = builder.get(0x12)
+    assert codepoint is not None
+    codepoint.set_name("LETTER A")
+    codepoint.case = 0x14
+    codepoint.alternate = ["letter a", "first letter"]
+    codepoint.comments = ["see also 0014"]
+    codepoint.related = [0x14, 0x30]
+    codepoint.confusables = [0x31]
+    codepoint.combinables = [[0x14, 0x30], [0x31]]
+    codepoint = builder.get(0x14)
+    assert codepoint is not None
+    codepoint.set_name("LETTER B")
+    return builder.build()
+
+
+def test_round_trip() -> None:
+    store = _build()
+    assert len(store) == 2
+    codepoint = store.get(0x12)
+    assert codepoint is not None
+    assert codepoint.name() == "LETTER A"
+    assert codepoint.case == 0x14
+    assert codepoint.alternate == ["letter a", "first letter"]
+    assert codepoint.comments == ["see also 0014"]
+    assert codepoint.related == [0x14, 0x30]
+    assert codepoint.confusables == [0x31]
+    assert codepoint.combinables == [[0x14, 0x30], [0x31]]
+    assert (codepoint.prev, codepoint.next) == (0x11, 0x13)
+
+    codepoint = store.get(0x14)
+    assert codepoint is not None
+    assert codepoint.name() == "LETTER B"
+    assert codepoint.case is None
+    assert not codepoint.alternate and not codepoint.comments and not codepoint.related
+    assert not codepoint.confusables and not codepoint.combinables
+    assert list(store.iter_assigned()) == [0x12, 0x14]
+    assert list(store.iter_alternates()) == [(0x12, "letter a"), (0x12, "first letter")]
+
+
+def test_unassigned_ranges() -> None:
+    store = _build()
+    assert list(store.iter_segments()) == [
+        (0x10, 0x11, 0x10, CodepointStore.UNASSIGNED),
+        (0x12, 0x12, 0x10, "LETTER A"),
+        (0x13, 0x13, 0x10, CodepointStore.UNASSIGNED),
+        (0x14, 0x14, 0x10, "LETTER B"),
+        (0x15, 0x1F, 0x10, CodepointStore.UNASSIGNED),
+        (0x30, 0x3F, 0x30, CodepointStore.UNASSIGNED),
+    ]
+    neighbours: typing.Dict[int, typing.Tuple[typing.Optional[int], typing.Optional[int]]] = {
+        # first and last codepoint of all blocks
+        0x10: (None, 0x11),
+        0x1F: (0x1E, 0x30),
+        0x30: (0x1F, 0x31),
+        0x3F: (0x3E, None),
+        # inside and at the edges of ranges next to rows
+        0x11: (0x10, 0x12),
+        0x13: (0x12, 0x14),
+        0x15: (0x14, 0x16),
+        0x18: (0x17, 0x19),
+        0x35: (0x34, 0x36),
+    }
+    for code, (prev, next_) in neighbours.items():
+        codepoint = store.get(code)
+        assert codepoint is not None
+        assert codepoint.name() == CodepointStore.UNASSIGNED
+        assert (codepoint.prev, codepoint.next) == (prev, next_), hex(code)
+        info = store.get_info(code)
+        assert info is not None and info.name() == CodepointStore.UNASSIGNED
+
+    for missing in [None, -1, 0x0F, 0x20, 0x2F, 0x40, 0x10FFFF]:
+        assert not store.contains(missing)
+        assert store.get(missing) is None and store.get_info(missing) is None
+
+
+def test_prev_next(uinfo: UInfo) -> None:
+    # the neighbours of all codepoints of the benchmark fixtures match the ones of a linear scan
+    codes = [code for code in range(0x110000) if uinfo.get_codepoint_info(code) is not None]
+    for prev, code, next_ in zip([None, *codes], codes, [*codes[1:], None]):
+        codepoint = uinfo.get_codepoint(code)
+        assert codepoint is not None
+        assert (codepoint.prev, codepoint.next) == (prev, next_), hex(code)
@@ -0,0 +1,135 @@
+import http.server
+import json
+import pathlib
+import threading
+import time
+import typing
+import urllib.parse
+
+import pytest
+import wikipedia  # type: ignore
+
+from unicode import summaries
+from unicode.summaries import WikipediaSummaries, set_api_url
+
+
+class _WikipediaApi(http.server.BaseHTTPRequestHandler):
+    # stand-in for the MediaWiki API, answering the queries of wikipedia.summary()
+    state: typing.Dict[str, typing.Any] = {}
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        self.state["requests"] += 1
+        time.sleep(self.state["delay"])
+        if self.state["fail"]:
+            self.send_error(500)
+            return
+        params = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(self.path).query, keep_blank_values=True))
+        if params.get("list") == "search":
+            result: typing.Dict[str, typing.Any] = {"query": {"search": [{"title": params["srsearch"]}]}}
+        elif params.get("prop") == "extracts":
+            result = {"query": {"pages": {"1": {"extract": self.state["summaries"][params["titles"]]}}}}
+        else:
+            title = params["titles"]
+            result = {"query": {"pages": {"1": {"title": title, "fullurl": f"https://wikipedia.test/{title}"}}}}
+        data = json.dumps(result).encode("utf-8")
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args: typing.Any) -> None:  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture(name="api")
+def fixture_api() -> typing.Iterator[typing.Dict[str, typing.Any]]:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _WikipediaApi)
+    server.daemon_threads = True
+    _WikipediaApi.state = {"requests": 0, "delay": 0.0, "fail": False, "summaries": {}}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    api_url = wikipedia.wikipedia.API_URL
+    set_api_url(f"http://127.0.0.1:{server.server_address[1]}/w/api.php")
+    yield _WikipediaApi.state
+    set_api_url(api_url)
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_and_persist(api: typing.Dict[str, typing.Any], tmp_path: pathlib.Path) -> None:
+    api["summaries"]["Persisted"] = "Persisted is a block."
+    cache_file = str(tmp_path / "summaries.json")
+    cache = WikipediaSummaries(cache_file)
+    assert cache.get("Persisted") == ""
+    assert cache.wait(10)
+    assert "Persisted is a block." in cache.get("Persisted")
+    cache.shutdown()
+
+    requests = api["requests"]
+    cache = WikipediaSummaries(cache_file)
+    assert "Persisted is a block." in cache.get("Persisted")
+    assert cache.wait(10)
+    assert api["requests"] == requests
+    cache.shutdown()
+
+
+def test_refresh_after_ttl(api: typing.Dict[str, typing.Any]) -> None:
+    api["summaries"]["Expiring"] = "Old summary."
+    cache = WikipediaSummaries(ttl=0)
+    cache.get("Expiring")
+    assert cache.wait(10)
+    api["summaries"]["Expiring"] = "New summary."
+    # the expired summary is served while the new one is fetched
+    assert "Old summary." in cache.get("Expiring")
+    assert cache.wait(10)
+    assert "New summary." in cache.get("Expiring")
+    cache.shutdown()
+
+
+def test_backoff(api: typing.Dict[str, typing.Any], tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    api["summaries"]["Failing"] = "Failing is a block."
+    api["fail"] = True
+    cache_file = tmp_path / "summaries.json"
+    cache = WikipediaSummaries(str(cache_file))
+    assert cache.get("Failing") == ""
+    assert cache.wait(10)
+    entry = json.loads(cache_file.read_text(encoding="utf-8"))["Failing"]
+    assert entry["failures"] == 1
+    assert entry["retry"] >= time.time() + summaries.RETRY_MIN_DELAY - 10
+
+    # no retry before the delay passed
+    requests = api["requests"]
+    api["fail"] = False
+    assert cache.get("Failing") == ""
+    assert cache.wait(10)
+    assert api["requests"] == requests
+    cache.shutdown()
+
+    monkeypatch.setattr(summaries.time, "time", lambda: entry["retry"] + 1)
+    cache = WikipediaSummaries(str(cache_file))
+    cache.get("Failing")
+    assert cache.wait(10)
+    assert "Failing is a block." in cache.get("Failing")
+    cache.shutdown()
+
+
+def test_timeout(api: typing.Dict[str, typing.Any], monkeypatch: pytest.MonkeyPatch) -> None:
+    api["summaries"]["Slow"] = "Slow is a block."
+    api["delay"] = 1.0
+    cache = WikipediaSummaries()
+    cache.get("Slow")
+    # the wait is bounded by its deadline, ...
+    assert not cache.wait(0.1)
+    # ... the shutdown by the request timeout
+    monkeypatch.setattr(summaries, "FETCH_TIMEOUT", 0.2)
+    start_time = time.monotonic()
+    cache.shutdown()
+    assert time.monotonic() - start_time < 5
+
+    # ... and a fetch as well
+    cache = WikipediaSummaries()
+    cache.get("Slow timeout")
+    assert cache.wait(10)
+    assert cache.get("Slow timeout") == ""
+    cache.shutdown()
@@ -0,0 +1,271 @@
+import functools
+import json
+import logging
+import time
+import typing
+
+from flask import Blueprint, current_app, jsonify, request
+from werkzeug.wrappers import Response
+
+from unicode.block import BlockInfo
+from unicode.codepoint import CodepointInfo, hex2id
+from unicode.datasets import current_uinfo, request_uinfo
+from unicode.metrics import observe_search
+from unicode.skeleton import Watchlist
+from unicode.uinfo import UInfo
+
+# the JSON API, served below /api/
+api = Blueprint("api", __name__, url_prefix="/api")
+
+ResponseIntT = typing.Tuple[Response, int]
+
+API_SEARCH_PAGE_SIZE = 100
+API_SUGGEST_SIZE = 10
+# default limits of the batch APIs (codepoints per request, characters per text)
+API_BATCH_LIMIT = 10000
+API_ANALYZE_LIMIT = 100000
+
+
+@api.route("/search", methods=["GET"])
+def search() -> ResponseIntT:
+    query = request.args.get("q", "")
+    cursor = request.args.get("cursor")
+    logging.info("get /api/search/%s", query)
+    names = current_uinfo.names()
+    if not cursor:
+        start_time = time.perf_counter()
+        matches, _ = names.search_direct(query)
+        observe_search("direct", start_time, len(matches))
+        if len(matches) > 0:
+            return jsonify(query=query, total=len(matches), results=_infos_json(matches), next_cursor=None), 200
+    start_time = time.perf_counter()
+    try:
+        matches, next_cursor, total = names.search_ranked(query, API_SEARCH_PAGE_SIZE, cursor)
+    except ValueError as error:
+        return jsonify(error=str(error)), 400
+    observe_search("ranked", start_time, total)
+    return jsonify(query=query, total=total, results=_infos_json(matches), next_cursor=next_cursor), 200
+
+
+@api.route("/suggest", methods=["GET"])
+def suggest() -> ResponseIntT:
+    prefix = request.args.get("prefix", "")
+    start_time = time.perf_counter()
+    results = current_uinfo.names().suggest(prefix, API_SUGGEST_SIZE)
+    observe_search("suggest", start_time, len(results))
+    suggestions = []
+    blocks = current_uinfo.blocks()
+    for text, kind, target in results:
+        info: typing.Union[BlockInfo, CodepointInfo, None]
+        info = blocks.get_block_info(target) if kind == "block" else current_uinfo.get_codepoint_info(target)
+        if info is not None:
+            suggestions.append({"text": text, "kind": kind, "url": info.url()})
+    return jsonify(prefix=prefix, suggestions=suggestions), 200
+
+
+@api.route("/codepoints", methods=["POST"])
+def codepoints() -> typing.Union[Response, ResponseIntT]:
+    # {"codepoints": [65, "1F600", "U+00E9", ...]} -> {"results": [record, ...]} in the given order
+    body = request.get_json(silent=True)
+    codes = body.get("codepoints") if isinstance(body, dict) else None
+    if not isinstance(codes, list):
+        return jsonify(error='expected a JSON object with a "codepoints" list'), 400
+    limit = current_app.config.get("API_BATCH_LIMIT", API_BATCH_LIMIT)
+    if len(codes) > limit:
+        return jsonify(error=f"too many codepoints (limit {limit})"), 400
+    codepoint_ids = []
+    for code in codes:
+        codepoint_id = _parse_codepoint_id(code)
+        if codepoint_id is None:
+            return jsonify(error=f"invalid codepoint: {code}"), 400
+        codepoint_ids.append(codepoint_id)
+    return _stream_records(request_uinfo(), codepoint_ids)
+
+
+@api.route("/analyze", methods=["POST"])
+def analyze() -> typing.Union[Response, ResponseIntT]:
+    # {"text": "..."} (or the text as request body) -> {"results": [record, ...]} for each character of the text
+    body = request.get_json(silent=True)
+    if isinstance(body, dict):
+        text = body.get("text")
+    else:
+        try:
+            text = request.get_data().decode("utf-8")
+        except UnicodeDecodeError:
+            return jsonify(error="the text is not valid UTF-8"), 400
+    if not isinstance(text, str):
+        return jsonify(error='expected a JSON object with a "text" string or a UTF-8 body'), 400
+    limit = current_app.config.get("API_ANALYZE_LIMIT", API_ANALYZE_LIMIT)
+    if len(text) > limit:
+        return jsonify(error=f"text too long (limit {limit} characters)"), 400
+    return _stream_records(request_uinfo(), [ord(char) for char in text])
+
+
+@api.route("/skeleton", methods=["POST"])
+def skeleton() -> ResponseIntT:
+    # {"strings": [...]} -> {"skeletons": [...]}, the UTS #39 skeletons in the given order
+    strings = _string_list(request.get_json(silent=True), "strings")
+    if strings is None:
+        return jsonify(error='expected a JSON object with a "strings" list'), 400
+    uinfo = request_uinfo()
+    if not uinfo.complete():
+        return jsonify(error="confusables are still loading"), 503
+    return jsonify(skeletons=uinfo.confusables().skeletons(strings)), 200
+
+
+@api.route("/confusable", methods=["POST"])
+def confusable() -> ResponseIntT:
+    # {"pairs": [["paypal", "p\u0430yp\u0430l"], ...]} -> {"results": [true, ...]}
+    pairs = _string_pairs(request.get_json(silent=True))
+    if pairs is None:
+        return jsonify(error='expected a JSON object with a "pairs" list of string pairs'), 400
+    uinfo = request_uinfo()
+    if not uinfo.complete():
+        return jsonify(error="confusables are still loading"), 503
+    to_skeleton = uinfo.confusables().skeleton
+    return jsonify(results=[to_skeleton(text1) == to_skeleton(text2) for text1, text2 in pairs]), 200
+
+
+@api.route("/screen", methods=["POST"])
+def screen() -> ResponseIntT:
+    # {"strings": [...], "watchlist": [...]} -> {"matches": [{"string": ..., "watchlist": [...]}, ...]} for the strings
+    # confusable with watchlist entries; without "watchlist", the one of WATCHLIST_FILE is used
+    body = request.get_json(silent=True)
+    strings = _string_list(body, "strings")
+    if strings is None:
+        return jsonify(error='expected a JSON object with a "strings" list'), 400
+    uinfo = request_uinfo()
+    if not uinfo.complete():
+        return jsonify(error="confusables are still loading"), 503
+    watchlist: typing.Optional[Watchlist]
+    if isinstance(body, dict) and "watchlist" in body:
+        entries = _string_list(body, "watchlist")
+        if entries is None:
+            return jsonify(error='"watchlist" has to be a list of strings'), 400
+        watchlist = Watchlist(uinfo.confusables(), entries)
+    else:
+        watchlist = _configured_watchlist(uinfo)
+        if watchlist is None:
+            return jsonify(error='no "watchlist" given and no WATCHLIST_FILE configured'), 400
+    return jsonify(matches=[{"string": text, "watchlist": entries} for text, entries in watchlist.screen(strings)]), 200
+
+
+@api.route("/fold", methods=["POST"])
+def fold() -> ResponseIntT:
+    # {"strings": [...], "mode": "full" or "simple", "turkic": false} -> {"folded": [...]}
+    body = request.get_json(silent=True)
+    strings = _string_list(body, "strings")
+    mode = _fold_mode(body)
+    if strings is None or mode is None:
+        return jsonify(error='expected a JSON object with a "strings" list (and optional "mode" and "turkic")'), 400
+    uinfo = request_uinfo()
+    if not uinfo.complete():
+        return jsonify(error="case foldings are still loading"), 503
+    return jsonify(folded=uinfo.case_folding().fold_all(strings, *mode)), 200
+
+
+@api.route("/fold/compare", methods=["POST"])
+def fold_compare() -> ResponseIntT:
+    # {"pairs": [["Straße", "STRASSE"], ...], "mode": ..., "turkic": ...} -> {"results": [true, ...]}, caseless matches
+    body = request.get_json(silent=True)
+    pairs = _string_pairs(body)
+    mode = _fold_mode(body)
+    if pairs is None or mode is None:
+        return jsonify(error='expected a JSON object with a "pairs" list (and optional "mode" and "turkic")'), 400
+    uinfo = request_uinfo()
+    if not uinfo.complete():
+        return jsonify(error="case foldings are still loading"), 503
+    return jsonify(results=uinfo.case_folding().equal_all(pairs, *mode)), 200
+
+
+def _fold_mode(body: typing.Any) -> typing.Optional[typing.Tuple[bool, bool]]:
+    # (full, turkic)
+    if not isinstance(body, dict):
+        return None
+    mode, turkic = body.get("mode", "full"), body.get("turkic", False)
+    if mode not in ("full", "simple") or not isinstance(turkic, bool):
+        return None
+    return mode == "full", turkic
+
+
+def _string_pairs(body: typing.Any) -> typing.Optional[typing.List[typing.Tuple[str, str]]]:
+    pairs = body.get("pairs") if isinstance(body, dict) else None
+    if not isinstance(pairs, list) or len(pairs) > current_app.config.get("API_BATCH_LIMIT", API_BATCH_LIMIT):
+        return None
+    if not all(isinstance(pair, list) and len(pair) == 2 and all(isinstance(s, str) for s in pair) for pair in pairs):
+        return None
+    return [(pair[0], pair[1]) for pair in pairs]
+
+
+def _string_list(body: typing.Any, key: str) -> typing.Optional[typing.List[str]]:
+    values = body.get(key) if isinstance(body, dict) else None
+    if not isinstance(values, list) or len(values) > current_app.config.get("API_BATCH_LIMIT", API_BATCH_LIMIT):
+        return None
+    return values if all(isinstance(value, str) for value in values) else None
+
+
+@functools.lru_cache(maxsize=1)
+def _configured_watchlist(uinfo: UInfo) -> typing.Optional[Watchlist]:
+    # WATCHLIST_FILE: one entry per line; indexed once per dataset
+    file_name = current_app.config.get("WATCHLIST_FILE")
+    if not file_name:
+        return None
+    with open(file_name, encoding="utf-8") as f:
+        return Watchlist(uinfo.confusables(), (line.strip() for line in f if line.strip()))
+
+
+def _parse_codepoint_id(code: typing.Any) -> typing.Optional[int]:
+    # ints or hex strings, optionally prefixed by "U+"
+    if isinstance(code, bool):
+        return None
+    if isinstance(code, int):
+        return code if 0 <= code <= 0x10FFFF else None
+    if isinstance(code, str):
+        hex_string = code[2:] if code[:2] in ("U+", "u+") else code
+        codepoint_id = hex2id(hex_string.lower())
+        return codepoint_id if codepoint_id is not None and codepoint_id <= 0x10FFFF else None
+    return None
+
+
+def _stream_records(uinfo: UInfo, codepoint_ids: typing.List[int]) -> Response:
+    # streams the records instead of building the whole response in memory; repeated codepoints (as in texts) are
+    # looked up once
+    def generate() -> typing.Iterator[str]:
+        records: typing.Dict[int, str] = {}
+        yield '{"results": ['
+        for index, codepoint_id in enumerate(codepoint_ids):
+            record = records.get(codepoint_id)
+            if record is None:
+                record = json.dumps(_codepoint_record(uinfo, codepoint_id))
+                records[codepoint_id] = record
+            yield record if index == 0 else f", {record}"
+        yield "]}"
+
+    return Response(generate(), mimetype="application/json")
+
+
+def _codepoint_record(uinfo: UInfo, codepoint_id: int) -> typing.Dict[str, typing.Any]:
+    codepoint = uinfo.get_codepoint(codepoint_id)
+    if codepoint is None:
+        return {"codepoint": f"U+{codepoint_id:04X}", "name": None}
+    block = uinfo.blocks().get_block_info_of(codepoint_id)
+    subblock = uinfo.blocks().get_subblock_of(codepoint_id)
+    case = uinfo.get_codepoint_info(codepoint.case)
+    return {
+        "codepoint": codepoint.u_plus(),
+        "name": codepoint.name(),
+        "string": codepoint.get_string(),
+        "url": codepoint.url(),
+        "block": None if block is None else {"name": block.name(), "url": block.url()},
+        "subblock": None if subblock is None else subblock.name(),
+        "case": None if case is None else _infos_json([case])[0],
+        "confusables": _infos_json(list(filter(None, map(uinfo.get_codepoint_info, codepoint.confusables)))),
+        "related": _infos_json(list(filter(None, map(uinfo.get_codepoint_info, codepoint.related)))),
+    }
+
+
+def _infos_json(infos: typing.List[CodepointInfo]) -> typing.List[typing.Dict[str, typing.Any]]:
+    return [
+        {"codepoint": info.u_plus(), "name": info.name(), "string": info.get_string(), "url": info.url()}
+        for info in infos
+    ]
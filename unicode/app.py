@@ -1,33 +1,296 @@
+import functools
+import hashlib
 import logging
+import hmac
 import os
+import signal
+import threading
+import time
 import typing
 
-import appdirs  # type: ignore
-from flask import Flask, render_template, url_for, request, redirect
+from flask import Flask, g, jsonify, render_template, url_for, request, redirect
 from flask_caching import Cache  # type: ignore
 from werkzeug.wrappers import Response
 
+from unicode import datasets
+from unicode.api import api
+from unicode.cache import DEFAULT_MAX_BYTES, RESPONSE_CACHE_TARGET
 from unicode.codepoint import hex2id
+from unicode.datasets import cache_dir, current_uinfo, data_urls, snapshot_file, start_loading_versions, start_reload
 from unicode.download import fetch_data_files
-from unicode.uinfo import UInfo
-
+from unicode.metrics import (
+    CACHE_REQUESTS,
+    CONTENT_TYPE,
+    LOAD_SECONDS,
+    REGISTRY,
+    REQUEST_SECONDS,
+    observe_search,
+    update_process_metrics,
+)
+from unicode.render import StaticRenderer, base_key, page_key
+from unicode.summaries import (
+    DEFAULT_TTL,
+    DEFAULT_WAIT,
+    WIKIPEDIA_SUMMARIES_TARGET,
+    WikipediaSummaries,
+    set_api_url,
+)
 
 flask_app = Flask(__name__)
+flask_app.register_blueprint(api)
 cache = Cache(flask_app, config={"CACHE_TYPE": "simple"})
-unicode_info = UInfo()
 
 StrIntT = typing.Tuple[str, int]
+ResponseIntT = typing.Tuple[Response, int]
+
+WELCOME_CHARS_MARKER = "<!-- random characters -->"
+
+# Cache-Control max-age (seconds) by endpoint; block pages change when their wikipedia summary arrives
+DEFAULT_MAX_AGE = {
+    "show_code": 24 * 3600,
+    "show_block": 3600,
+    "sitemap": 24 * 3600,
+    "robots": 24 * 3600,
+}
+
+ViewT = typing.Callable[..., typing.Any]
+
+# set by memoized functions that have been called on a cache miss
+_cache_miss = threading.local()
 
 
 def configure(config_file_name: str, reset_cache: bool) -> None:
+    data_dir = _prepare_data(config_file_name, reset_cache)
+    # no threads have been started yet, so the parser processes can be forked from this process
+    datasets.unicode_info.load(
+        data_dir,
+        snapshot_file(flask_app.config, data_dir),
+        flask_app.config.get("LOAD_JOBS"),
+        flask_app.config.get("LAZY_LOAD", True),
+    )
+    datasets.unicode_info.set_wikipedia_summaries(_wikipedia_summaries(data_dir))
+    cache.init_app(flask_app, config=_cache_config(data_dir))
+    start_loading_versions(flask_app, reset_cache)
+    reload_signal = flask_app.config.get("RELOAD_SIGNAL")
+    if reload_signal and threading.current_thread() is threading.main_thread():
+        signal.signal(getattr(signal, reload_signal), lambda signum, frame: start_reload(flask_app, cache))
+
+
+def build_snapshot(config_file_name: str, reset_cache: bool) -> None:
+    data_dir = _prepare_data(config_file_name, reset_cache)
+    unicode_info = datasets.unicode_info
+    unicode_info.load(data_dir, jobs=flask_app.config.get("LOAD_JOBS"))
+    snapshot = snapshot_file(flask_app.config, data_dir)
+    logging.info("writing snapshot: %s", snapshot)
+    unicode_info.save_snapshot(snapshot)
+
+
+def render_static(config_file_name: str, reset_cache: bool, out_dir: str, jobs: typing.Optional[int]) -> None:
+    data_dir = _prepare_data(config_file_name, reset_cache)
+    unicode_info = datasets.unicode_info
+    unicode_info.load(data_dir, snapshot_file(flask_app.config, data_dir), flask_app.config.get("LOAD_JOBS"))
+    summaries = _wikipedia_summaries(data_dir)
+    unicode_info.set_wikipedia_summaries(summaries)
+    if not summaries.wait(flask_app.config.get("WIKIPEDIA_WAIT", DEFAULT_WAIT)):
+        logging.warning("rendering without the wikipedia summaries that are still being fetched")
+    # the renderer forks workers, which must not inherit the lock of the summaries held by a fetch thread
+    summaries.shutdown()
+    # every page is rendered once, caching would only cost memory
+    cache.init_app(flask_app, config={"CACHE_TYPE": "null", "CACHE_NO_NULL_WARNING": True})
+
+    key = base_key(flask_app, unicode_info.version())
+    pages = {"/sitemap.txt": key, "/robots.txt": key}
+    for codepoint_id in unicode_info.get_assigned_codepoint_ids():
+        pages[f"/c/{codepoint_id:04X}"] = key
+    blocks = unicode_info.blocks()
+    for block_info in blocks.get_block_infos():
+        block = blocks.get_block(block_info.block_id())
+        assert block is not None
+        pages[block.url()] = page_key(key, unicode_info.get_wikipedia_summary(block))
+    StaticRenderer(flask_app, out_dir).render(pages, jobs)
+
+
+def _prepare_data(config_file_name: str, reset_cache: bool) -> str:
     flask_app.config.from_pyfile(os.path.abspath(config_file_name))
+    data_dir = cache_dir(flask_app.config)
+    fetch_data_files(data_dir, reset_cache, data_urls(flask_app.config))
+    return data_dir
+
+
+def _wikipedia_summaries(data_dir: str) -> WikipediaSummaries:
+    if "WIKIPEDIA_API_URL" in flask_app.config:
+        set_api_url(flask_app.config["WIKIPEDIA_API_URL"])
+    return WikipediaSummaries(
+        os.path.join(data_dir, WIKIPEDIA_SUMMARIES_TARGET), ttl=flask_app.config.get("WIKIPEDIA_TTL", DEFAULT_TTL)
+    )
 
-    if "CACHE_DIR" in flask_app.config:
-        cache_dir = flask_app.config["CACHE_DIR"]
-    else:
-        cache_dir = os.path.join(appdirs.user_cache_dir("flopp.unicode"))
-    fetch_data_files(cache_dir, reset_cache)
-    unicode_info.load(cache_dir)
+
+def _cache_config(data_dir: str) -> typing.Dict[str, typing.Any]:
+    # cached responses are keyed by the dataset version (see memoized), so by default they never expire; responses of
+    # an outdated dataset are never hit again and eventually get evicted
+    config = {
+        "CACHE_KEY_PREFIX": "unicode:",
+        "CACHE_DEFAULT_TIMEOUT": flask_app.config.get("RESPONSE_CACHE_TIMEOUT", 0),
+    }
+    if flask_app.config.get("RESPONSE_CACHE") == "simple":
+        # per worker process
+        config["CACHE_TYPE"] = "simple"
+        return config
+    # shared by all worker processes using the same file
+    config["CACHE_TYPE"] = "unicode.cache.SqliteCache"
+    config["CACHE_ARGS"] = [flask_app.config.get("RESPONSE_CACHE_FILE", os.path.join(data_dir, RESPONSE_CACHE_TARGET))]
+    config["CACHE_OPTIONS"] = {"max_bytes": flask_app.config.get("RESPONSE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)}
+    return config
+
+
+def conditional(extra: typing.Optional[typing.Callable[..., str]] = None) -> typing.Callable[[ViewT], ViewT]:
+    # Adds a strong ETag derived from the dataset version, the endpoint and its arguments (and `extra`, computed from
+    # the arguments, for views depending on more than the dataset) plus a Cache-Control header to successful
+    # responses. Requests with a matching If-None-Match are answered with 304 without calling the view. While the
+    # secondary datasets are still loading, responses are neither validated nor cacheable.
+    def decorator(view: ViewT) -> ViewT:
+        @functools.wraps(view)
+        def wrapper(**kwargs: typing.Any) -> Response:
+            if _incomplete():
+                return flask_app.make_response(view(**kwargs))
+            endpoint = request.endpoint or view.__name__
+            etag_inputs = [current_uinfo.version(), endpoint] + [f"{name}={kwargs[name]}" for name in sorted(kwargs)]
+            if extra is not None:
+                etag_inputs.append(extra(**kwargs))
+            etag = hashlib.sha256("\n".join(etag_inputs).encode("utf-8")).hexdigest()[:32]
+            # If-None-Match uses the weak comparison; compressing proxies turn the ETag into a weak one. "*" is not
+            # answered with 304: it would hide that the resource does not exist.
+            if not request.if_none_match.star_tag and request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = flask_app.make_response(view(**kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.cache_control.public = True
+            response.cache_control.max_age = _max_age(endpoint)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _max_age(endpoint: str) -> int:
+    max_age = dict(DEFAULT_MAX_AGE, **flask_app.config.get("HTTP_MAX_AGE", {}))
+    return int(max_age.get(endpoint, 0))
+
+
+def _incomplete() -> bool:
+    return not current_uinfo.complete()
+
+
+def _versioned_name(name: str) -> str:
+    return f"{name}@{current_uinfo.version()[:16]}"
+
+
+def memoized(func: ViewT) -> ViewT:
+    # cache.memoize() keyed by the request's dataset version, counting the cache hits and misses of `func`; pages
+    # rendered from incomplete data are not cached
+    @functools.wraps(func)
+    def compute(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        _cache_miss.value = True
+        return func(*args, **kwargs)
+
+    cached = cache.memoize(make_name=_versioned_name, unless=_incomplete)(compute)
+
+    @functools.wraps(cached)
+    def lookup(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        outer_miss = getattr(_cache_miss, "value", False)
+        _cache_miss.value = False
+        try:
+            result = cached(*args, **kwargs)
+            CACHE_REQUESTS.inc(func.__name__, "miss" if _cache_miss.value else "hit")
+            return result
+        finally:
+            _cache_miss.value = outer_miss
+
+    return lookup
+
+
+@flask_app.before_request
+def start_request_timer() -> None:
+    g.request_start_time = time.perf_counter()
+
+
+@flask_app.before_request
+def pin_dataset() -> typing.Optional[StrIntT]:
+    # views of /v/<unicode_version>/ routes get the dataset of that unicode version
+    g.unicode_info = datasets.unicode_info
+    unicode_version = (request.view_args or {}).get("unicode_version")
+    if unicode_version is None or unicode_version == g.unicode_info.unicode_version():
+        return None
+    versions = datasets.versions
+    if unicode_version in versions:
+        g.unicode_info = versions[unicode_version]
+        return None
+    if unicode_version in flask_app.config.get("UNICODE_VERSIONS", []):
+        return f"Unicode {unicode_version} is not loaded, yet.", 503
+    return render_template("404.html"), 404
+
+
+@flask_app.after_request
+def observe_request(response: Response) -> Response:
+    if "request_start_time" in g:
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - g.request_start_time, route, request.method, str(response.status_code)
+        )
+    return response
+
+
+@flask_app.route("/healthz")
+def healthz() -> ResponseIntT:
+    return jsonify(status="ok"), 200
+
+
+@flask_app.route("/readyz")
+def readyz() -> ResponseIntT:
+    # ready as soon as the core datasets are loaded; "complete" tells whether the secondary datasets are loaded, too
+    ready = current_uinfo.ready()
+    return (
+        jsonify(
+            ready=ready,
+            complete=current_uinfo.complete(),
+            version=current_uinfo.version(),
+            unicode_versions=[current_uinfo.unicode_version()] + sorted(datasets.versions),
+            reloading=datasets.reloading(),
+        ),
+        200 if ready else 503,
+    )
+
+
+@flask_app.route("/admin/reload", methods=["POST"])
+def admin_reload() -> typing.Union[StrIntT, ResponseIntT]:
+    # reloads the dataset from the configured cache directory, or from the "cache_dir"/"snapshot_file" of a JSON body;
+    # only available if an ADMIN_TOKEN is configured, which has to be given as bearer token
+    token = flask_app.config.get("ADMIN_TOKEN")
+    if not token:
+        return render_template("404.html"), 404
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return jsonify(error="unauthorized"), 401
+    body = request.get_json(silent=True) or {}
+    data_dir, snapshot = body.get("cache_dir"), body.get("snapshot_file")
+    if data_dir is not None and not os.path.isdir(data_dir):
+        return jsonify(error=f"no such directory: {data_dir}"), 400
+    if not start_reload(flask_app, cache, data_dir, snapshot):
+        return jsonify(error="reload in progress"), 409
+    return jsonify(reloading=True, version=current_uinfo.version()), 202
+
+
+@flask_app.route("/metrics")
+def metrics() -> typing.Union[StrIntT, Response]:
+    if not flask_app.config.get("METRICS", False):
+        return render_template("404.html"), 404
+    for stage, seconds in current_uinfo.load_times().items():
+        LOAD_SECONDS.set(seconds, stage)
+    update_process_metrics()
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
 
 
 @flask_app.errorhandler(404)
@@ -50,58 +313,78 @@ def unhandled_exception(error: str) -> StrIntT:
 
 @flask_app.route("/")
 def welcome() -> StrIntT:
-    blocks = unicode_info.get_block_infos()
+    chars_html = render_template("welcome_chars.html", chars=current_uinfo.get_random_char_infos(32))
+    return _welcome_skeleton().replace(WELCOME_CHARS_MARKER, chars_html, 1), 200
+
+
+@memoized
+def _welcome_skeleton() -> str:
+    # the welcome page without its random characters
+    blocks = current_uinfo.blocks().get_block_infos()
     half = int(len(blocks) / 2)
     data = {
-        "chars": unicode_info.get_random_char_infos(32),
+        "chars_html": WELCOME_CHARS_MARKER,
         "blocks1": blocks[:half],
         "blocks2": blocks[half:],
     }
-    return render_template("welcome.html", data=data), 200
+    return render_template("welcome.html", data=data)
 
 
 @flask_app.route("/sitemap.txt")
-@cache.memoize(120)
+@conditional()
+@memoized
 def sitemap() -> StrIntT:
-    return render_template("sitemap.txt", blocks=unicode_info.get_block_infos()), 200
+    return render_template("sitemap.txt", blocks=current_uinfo.blocks().get_block_infos()), 200
 
 
 @flask_app.route("/robots.txt")
-@cache.memoize(120)
+@conditional()
+@memoized
 def robots() -> StrIntT:
     return render_template("robots.txt"), 200
 
 
+def _version_links(html: str, unicode_version: typing.Optional[str]) -> str:
+    # pages of /v/<unicode_version>/ routes link to the same unicode version
+    if unicode_version is None:
+        return html
+    return html.replace('href="/c/', f'href="/v/{unicode_version}/c/').replace(
+        'href="/b/', f'href="/v/{unicode_version}/b/'
+    )
+
+
 @flask_app.route("/c/<char_code>")
-@cache.memoize(120)
-def show_code(char_code: str) -> StrIntT:
-    codepoint = unicode_info.get_codepoint(hex2id(char_code.lower()))
+@flask_app.route("/v/<unicode_version>/c/<char_code>")
+@conditional()
+@memoized
+def show_code(char_code: str, unicode_version: typing.Optional[str] = None) -> StrIntT:
+    codepoint = current_uinfo.get_codepoint(hex2id(char_code.lower()))
     if codepoint is None:
         return render_template("404.html"), 404
 
     combinables = []
     for combinable in codepoint.combinables:
-        combinables.append([unicode_info.get_codepoint_info(codepoint_id) for codepoint_id in combinable])
+        combinables.append([current_uinfo.get_codepoint_info(codepoint_id) for codepoint_id in combinable])
 
     info = {
         "codepoint": codepoint,
         "related": list(
-            filter(None, [unicode_info.get_codepoint_info(code_related) for code_related in codepoint.related])
+            filter(None, [current_uinfo.get_codepoint_info(code_related) for code_related in codepoint.related])
         ),
         "confusables": list(
             filter(
-                None, [unicode_info.get_codepoint_info(code_confusable) for code_confusable in codepoint.confusables]
+                None, [current_uinfo.get_codepoint_info(code_confusable) for code_confusable in codepoint.confusables]
             )
         ),
         "combinables": combinables,
-        "case": unicode_info.get_codepoint_info(codepoint.case),
-        "prev": unicode_info.get_codepoint_info(codepoint.prev),
-        "next": unicode_info.get_codepoint_info(codepoint.next),
-        "block": unicode_info.get_block_info(codepoint.block),
-        "subblock": unicode_info.get_subblock(codepoint.subblock),
+        "case": current_uinfo.get_codepoint_info(codepoint.case),
+        "prev": current_uinfo.get_codepoint_info(codepoint.prev),
+        "next": current_uinfo.get_codepoint_info(codepoint.next),
+        "block": current_uinfo.blocks().get_block_info_of(codepoint.codepoint_id()),
+        "subblock": current_uinfo.blocks().get_subblock_of(codepoint.codepoint_id()),
     }
 
-    return render_template("code.html", data=info), 200
+    return _version_links(render_template("code.html", data=info), unicode_version), 200
 
 
 @flask_app.route("/code/<code>")
@@ -109,30 +392,46 @@ def show_code_old(code: str) -> Response:
     return redirect(url_for("show_code", char_code=code))
 
 
+def _block_summary(block_code: str, **_: typing.Any) -> str:
+    block = current_uinfo.blocks().get_block(hex2id(block_code.lower()))
+    return current_uinfo.get_wikipedia_summary(block) if block is not None else ""
+
+
 @flask_app.route("/b/<block_code>")
-@cache.memoize(120)
-def show_block(block_code: str) -> StrIntT:
-    block = unicode_info.get_block(hex2id(block_code.lower()))
+@flask_app.route("/v/<unicode_version>/b/<block_code>")
+@conditional(_block_summary)
+def show_block(block_code: str, unicode_version: typing.Optional[str] = None) -> StrIntT:
+    block = current_uinfo.blocks().get_block(hex2id(block_code.lower()))
     if not block:
         return render_template("404.html"), 404
+    # the wikipedia summary is fetched in the background, so it is part of the cache key
+    return _render_block(block.block_id(), current_uinfo.get_wikipedia_summary(block), unicode_version)
+
+
+@memoized
+def _render_block(block_id: int, wikipedia_summary: str, unicode_version: typing.Optional[str] = None) -> StrIntT:
+    blocks = current_uinfo.blocks()
+    block = blocks.get_block(block_id)
+    assert block is not None
 
     info = {
         "block": block,
+        "wikipedia_summary": wikipedia_summary,
         "chars": list(
-            filter(None, [unicode_info.get_codepoint_info(codepoint) for codepoint in block.codepoints_iter()])
+            filter(None, [current_uinfo.get_codepoint_info(codepoint) for codepoint in block.codepoints_iter()])
         ),
-        "prev": unicode_info.get_block_info(block.prev),
-        "next": unicode_info.get_block_info(block.next),
+        "prev": blocks.get_block_info(block.prev),
+        "next": blocks.get_block_info(block.next),
     }
 
-    return render_template("block.html", data=info), 200
+    return _version_links(render_template("block.html", data=info), unicode_version), 200
 
 
 @flask_app.route("/block/<name>")
 def show_block_old(name: str) -> typing.Union[StrIntT, Response]:
-    block_id = unicode_info.get_block_id_by_name(name)
+    block_id = current_uinfo.blocks().get_block_id_by_name(name)
     if block_id is not None:
-        return redirect(url_for("show_block", code=f"{block_id:04X}"))
+        return redirect(url_for("show_block", block_code=f"{block_id:04X}"))
     return render_template("404.html"), 404
 
 
@@ -140,7 +439,9 @@ def show_block_old(name: str) -> typing.Union[StrIntT, Response]:
 def search() -> StrIntT:
     query = request.form["q"]
     logging.info("get /search/%s", query)
-    matches, msg = unicode_info.search_by_name(query, 100)
+    start_time = time.perf_counter()
+    matches, msg = current_uinfo.names().search_by_name(query, 100)
+    observe_search("by_name", start_time, len(matches))
     return render_template("search_results.html", query=query, msg=msg, matches=matches), 200
 
 
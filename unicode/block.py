@@ -1,10 +1,14 @@
-import logging
+import array
+import bisect
 import re
 import typing
 
-import wikipedia  # type: ignore
+RE_NON_ALPHA = re.compile("[^a-z]+")
 
-from unicode.codepoint import code_link
+
+def normalize_block_name(name: str) -> str:
+    # "Basic Latin", "basic-latin" and "BasicLatin" are the same block
+    return RE_NON_ALPHA.sub("", name.lower())
 
 
 class BlockInfo:
@@ -30,7 +34,6 @@ class Block:
         self.info = BlockInfo(codepoint_from, name)
         self.codepoint_to = codepoint_to
         self.wikipedia: typing.Optional[str] = None
-        self.wikipedia_summary: typing.Optional[str] = None
         self.prev: typing.Optional[int] = None
         self.next: typing.Optional[int] = None
 
@@ -58,69 +61,10 @@ class Block:
     def codepoints_iter(self) -> typing.Iterable[int]:
         return range(self.info.codepoint_from, self.codepoint_to + 1)
 
-    def fetch_wikipedia(self) -> None:
-        if self.wikipedia_summary is not None:
-            return
+    def wikipedia_topic(self) -> typing.Optional[str]:
         if self.wikipedia is None:
-            self.wikipedia_summary = ""
-            return
-        try:
-            topic = self.wikipedia.split("/")[-1].replace("_", " ")
-            self.wikipedia_summary = Block._format_wikipedia(wikipedia.summary(topic, sentences=3))
-        except Exception:  # pylint: disable=broad-except
-            logging.warning("Failed to fetch wikipedia infos for topic %s", topic)
-            self.wikipedia_summary = ""
-
-    @staticmethod
-    def _format_wikipedia(wikipedia_text: str) -> str:
-        lines = []
-        last_empty = True
-
-        re_h2 = re.compile(r"^== (.*) ==$")
-        re_h3 = re.compile(r"^=== (.*) ===$")
-
-        for line in wikipedia_text.split("\n"):
-            line = line.strip()
-            if not line:
-                if not last_empty:
-                    lines.append("")
-                last_empty = True
-                continue
-
-            last_empty = False
-            match = re_h2.match(line)
-            if match:
-                lines.append(f"<b>{match.group(1)}</b>")
-                continue
-            match = re_h3.match(line)
-            if match:
-                lines.append(f"<b>{match.group(1)}</b>")
-                continue
-
-            lines.append(Block._replace_codepoints_with_links(line))
-        return "<br />\n".join(lines)
-
-    @staticmethod
-    def _replace_codepoints_with_links(s: str) -> str:
-        re_single_code = re.compile(r"U\+([0-9A-Fa-f]{4,6})\b")
-        re_code_range = re.compile(r"\b([0-9A-Fa-f]{4,6})[-–—]([0-9A-Fa-f]{4,6})\b")
-
-        replacements = []
-        for match in re_single_code.finditer(s):
-            original = match.group(0)
-            code = match.group(1).upper()
-            replacements.append((original, code_link(code)))
-        for match in re_code_range.finditer(s):
-            from_original = match.group(1)
-            to_original = match.group(2)
-            from_code = from_original.upper()
-            to_code = from_original.upper()
-            replacements.append((from_original, code_link(from_code)))
-            replacements.append((to_original, code_link(to_code)))
-        for replacement in replacements:
-            s = s.replace(replacement[0], replacement[1])
-
-        return s
+            return None
+        return self.wikipedia.split("/")[-1].replace("_", " ")
 
 
 class Subblock:
@@ -151,3 +95,115 @@ class Subblock:
     def codepoints_iter(self) -> typing.Iterable[int]:
         assert self.codepoint_to is not None
         return range(self.codepoint_from, self.codepoint_to + 1)
+
+
+class IntervalIndex:
+    # Sorted, non-overlapping codepoint intervals with ids (block or subblock ids); an added interval replaces the
+    # overlapped parts of the intervals added before.
+
+    def __init__(self) -> None:
+        self._from = array.array("I")
+        self._to = array.array("I")
+        self._ids = array.array("I")
+
+    def add(self, range_from: int, range_to: int, interval_id: typing.Optional[int] = None) -> None:
+        if range_to < range_from:
+            return
+        index = bisect.bisect_left(self._from, range_from)
+        if index > 0 and self._to[index - 1] >= range_from:
+            if self._to[index - 1] > range_to:
+                # split the interval around the new one
+                self._insert(index, range_to + 1, self._to[index - 1], self._ids[index - 1])
+            self._to[index - 1] = range_from - 1
+        end = index
+        while end < len(self._from) and self._from[end] <= range_to:
+            if self._to[end] > range_to:
+                self._from[end] = range_to + 1
+                break
+            end += 1
+        del self._from[index:end]
+        del self._to[index:end]
+        del self._ids[index:end]
+        self._insert(index, range_from, range_to, range_from if interval_id is None else interval_id)
+
+    def _insert(self, index: int, range_from: int, range_to: int, interval_id: int) -> None:
+        self._from.insert(index, range_from)
+        self._to.insert(index, range_to)
+        self._ids.insert(index, interval_id)
+
+    def __len__(self) -> int:
+        return len(self._from)
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple[int, int, int]]:
+        # (id, from, to) in codepoint order
+        return zip(self._ids, self._from, self._to)
+
+    def interval(self, code: typing.Optional[int]) -> typing.Optional[typing.Tuple[int, int, int]]:
+        # (id, from, to) of the interval containing `code`
+        if code is None:
+            return None
+        index = bisect.bisect_right(self._from, code) - 1
+        if index >= 0 and code <= self._to[index]:
+            return self._ids[index], self._from[index], self._to[index]
+        return None
+
+    def find(self, code: typing.Optional[int]) -> typing.Optional[int]:
+        # id of the interval containing `code`
+        interval = self.interval(code)
+        return None if interval is None else interval[0]
+
+    def overlapping(self, range_from: int, range_to: int) -> typing.List[int]:
+        # ids of the intervals overlapping range_from..range_to, in codepoint order
+        index = max(bisect.bisect_right(self._from, range_from) - 1, 0)
+        if index < len(self._from) and self._to[index] < range_from:
+            index += 1
+        end = bisect.bisect_right(self._from, range_to)
+        return list(dict.fromkeys(self._ids[index:end]))
+
+
+class BlockTable:
+    # The blocks and subblocks of a dataset with their lookup indexes.
+
+    def __init__(self) -> None:
+        self.by_id: typing.Dict[int, Block] = {}
+        self.infos: typing.List[BlockInfo] = []
+        self.subblocks: typing.Dict[int, Subblock] = {}
+        # codepoint -> block/subblock id
+        self.block_index = IntervalIndex()
+        self.subblock_index = IntervalIndex()
+        # normalized block name -> block id
+        self.names: typing.Dict[str, int] = {}
+
+    def get_block(self, block_id: typing.Optional[int]) -> typing.Optional[Block]:
+        if block_id is None or block_id not in self.by_id:
+            return None
+        return self.by_id[block_id]
+
+    def get_block_info(self, block_id: typing.Optional[int]) -> typing.Optional[BlockInfo]:
+        block = self.get_block(block_id)
+        return None if block is None else block.info
+
+    def get_block_infos(self) -> typing.List[BlockInfo]:
+        return self.infos
+
+    def get_block_id_by_name(self, name: str) -> typing.Optional[int]:
+        return self.names.get(normalize_block_name(name))
+
+    def get_block_info_of(self, code: typing.Optional[int]) -> typing.Optional[BlockInfo]:
+        # the block containing `code`
+        return self.get_block_info(self.block_index.find(code))
+
+    def get_block_infos_in_range(self, range_from: int, range_to: int) -> typing.List[BlockInfo]:
+        # the blocks overlapping range_from..range_to
+        return [self.by_id[block_id].info for block_id in self.block_index.overlapping(range_from, range_to)]
+
+    def get_subblock(self, subblock_id: typing.Optional[int]) -> typing.Optional[Subblock]:
+        if subblock_id is None or subblock_id not in self.subblocks:
+            return None
+        return self.subblocks[subblock_id]
+
+    def get_subblock_of(self, code: typing.Optional[int]) -> typing.Optional[Subblock]:
+        return self.get_subblock(self.subblock_index.find(code))
+
+    def get_subblocks_in_range(self, range_from: int, range_to: int) -> typing.List[Subblock]:
+        return [self.subblocks[subblock_id] for subblock_id in self.subblock_index.overlapping(range_from, range_to)]
@@ -0,0 +1,170 @@
+import datetime
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import typing
+
+from flask import Flask
+from flask_caching.backends.base import BaseCache  # type: ignore
+
+RESPONSE_CACHE_TARGET = "responses.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# recording every single access would turn each cache hit into a write
+ACCESS_RESOLUTION = 10.0
+# evicting down to this fraction of the budget avoids evicting on every insert
+EVICTION_TARGET = 0.9
+
+TimeoutT = typing.Optional[typing.Union[int, datetime.timedelta]]
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS entries (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        expires REAL NOT NULL,
+        accessed REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)",
+    "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO meta VALUES ('size', 0)",
+    """CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+        UPDATE meta SET value = value + NEW.size WHERE name = 'size';
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN
+        UPDATE meta SET value = value + NEW.size - OLD.size WHERE name = 'size';
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+        UPDATE meta SET value = value - OLD.size WHERE name = 'size';
+    END""",
+]
+
+
+class SqliteCache(BaseCache):
+    # Flask-Caching backend storing the entries in a SQLite database, which is shared by all worker processes using
+    # the same file. The total size of the entries is bounded; least recently used entries are evicted first.
+
+    def __init__(
+        self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, default_timeout: int = 300, key_prefix: str = ""
+    ) -> None:
+        super().__init__(default_timeout=default_timeout)
+        self._path = path
+        self._max_bytes = max_bytes
+        self._key_prefix = key_prefix
+        self._local = threading.local()
+        with self._connection() as connection:
+            for statement in _SCHEMA:
+                connection.execute(statement)
+
+    @classmethod
+    def factory(
+        cls, app: Flask, config: typing.Dict[str, typing.Any], args: typing.List[typing.Any], kwargs: typing.Any
+    ) -> "SqliteCache":
+        kwargs.update(key_prefix=config.get("CACHE_KEY_PREFIX") or "")
+        return cls(*args, **kwargs)
+
+    def _connection(self) -> sqlite3.Connection:
+        # connections must neither be shared between threads nor survive a fork
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self._path, timeout=10.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _expires(self, timeout: TimeoutT) -> float:
+        seconds: int = self._normalize_timeout(timeout)
+        return 0.0 if seconds == 0 else time.time() + seconds
+
+    def get(self, key: str) -> typing.Any:
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT value, expires, accessed FROM entries WHERE key = ?", (self._key_prefix + key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires, accessed = row
+        now = time.time()
+        if expires != 0 and expires < now:
+            connection.execute("DELETE FROM entries WHERE key = ?", (self._key_prefix + key,))
+            return None
+        if now - accessed > ACCESS_RESOLUTION:
+            connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, self._key_prefix + key))
+        return pickle.loads(value)
+
+    def has(self, key: str) -> bool:
+        row = (
+            self._connection()
+            .execute("SELECT expires FROM entries WHERE key = ?", (self._key_prefix + key,))
+            .fetchone()
+        )
+        return row is not None and (row[0] == 0 or row[0] >= time.time())
+
+    def set(self, key: str, value: typing.Any, timeout: TimeoutT = None) -> bool:
+        return self._store(key, value, timeout, replace=True)
+
+    def add(self, key: str, value: typing.Any, timeout: TimeoutT = None) -> bool:
+        return self._store(key, value, timeout, replace=False)
+
+    def _store(self, key: str, value: typing.Any, timeout: TimeoutT, replace: bool) -> bool:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        size = len(data) + len(key)
+        # an entry exceeding the budget on its own would evict everything else and still not fit
+        if size > self._max_bytes:
+            return False
+        connection = self._connection()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if not replace and self.has(key):
+                connection.execute("ROLLBACK")
+                return False
+            connection.execute(
+                """INSERT INTO entries (key, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    value = excluded.value, size = excluded.size,
+                    expires = excluded.expires, accessed = excluded.accessed
+                """,
+                (self._key_prefix + key, data, size, self._expires(timeout), now),
+            )
+            self._evict(connection, self._key_prefix + key)
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            connection.execute("ROLLBACK")
+            raise
+        return True
+
+    def _evict(self, connection: sqlite3.Connection, keep: str) -> None:
+        # evicts the least recently used entries except `keep`, until the total size is down to the target
+        total = connection.execute("SELECT value FROM meta WHERE name = 'size'").fetchone()[0]
+        if total <= self._max_bytes:
+            return
+        connection.execute("DELETE FROM entries WHERE expires != 0 AND expires < ?", (time.time(),))
+        total = connection.execute("SELECT value FROM meta WHERE name = 'size'").fetchone()[0]
+        excess = total - int(self._max_bytes * EVICTION_TARGET)
+        if excess <= 0:
+            return
+        # `freed` is the size evicted before the entry; entries are evicted until it reaches the excess
+        connection.execute(
+            """DELETE FROM entries WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (
+                        ORDER BY accessed, key ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+                    ) - size AS freed
+                    FROM entries WHERE key != ?
+                ) WHERE freed < ?
+            )""",
+            (keep, excess),
+        )
+
+    def delete(self, key: str) -> bool:
+        cursor = self._connection().execute("DELETE FROM entries WHERE key = ?", (self._key_prefix + key,))
+        return bool(cursor.rowcount > 0)
+
+    def clear(self) -> bool:
+        self._connection().execute("DELETE FROM entries")
+        return True
@@ -0,0 +1,79 @@
+import typing
+
+# Case folding as defined by CaseFolding.txt, so it follows the unicode version of the data files (unlike
+# str.casefold(), which always does full folding with the unicode version of the running Python):
+# - simple folding (C + S): maps each character to a single character, keeping the string length
+# - full folding (C + F): may map a character to several characters, e.g. "ß" -> "ss"
+# - turkic (T): dotted/dotless i mappings replacing the C ones
+
+# joins the strings of an ASCII batch, so the whole batch is folded by a single bytes.translate() call
+BATCH_SEPARATOR = "\0"
+
+
+def _ascii_table(table: typing.Dict[int, str]) -> typing.Optional[bytes]:
+    # bytes.translate() table for ASCII text; None if an ASCII character folds to a non-ASCII one
+    ascii_table = bytearray(range(256))
+    for codepoint_id in range(128):
+        folding = table.get(codepoint_id)
+        if folding is None:
+            continue
+        if len(folding) != 1 or not folding.isascii() or codepoint_id == ord(BATCH_SEPARATOR):
+            return None
+        ascii_table[codepoint_id] = ord(folding)
+    return bytes(ascii_table)
+
+
+class CaseFolding:
+    # The folding tables precompiled into str.translate() tables; ASCII text, the bulk of typical input, is folded with
+    # bytes.translate() tables instead, which avoid a dict lookup per character.
+
+    def __init__(self, foldings: typing.Iterable[typing.Tuple[int, str, str]] = ()) -> None:
+        by_status: typing.Dict[str, typing.Dict[int, str]] = {"C": {}, "F": {}, "S": {}, "T": {}}
+        for codepoint_id, status, folding in foldings:
+            by_status[status][codepoint_id] = folding
+        simple = {**by_status["C"], **by_status["S"]}
+        full = {**by_status["C"], **by_status["F"]}
+        # (full, turkic) -> table
+        self._tables = {
+            (False, False): simple,
+            (True, False): full,
+            (False, True): {**simple, **by_status["T"]},
+            (True, True): {**full, **by_status["T"]},
+        }
+        self._ascii_tables = {mode: _ascii_table(table) for mode, table in self._tables.items()}
+
+    def __len__(self) -> int:
+        return len(self._tables[(True, False)])
+
+    def table(self, full: bool = True, turkic: bool = False) -> typing.Dict[int, str]:
+        return self._tables[(full, turkic)]
+
+    def fold(self, text: str, full: bool = True, turkic: bool = False) -> str:
+        ascii_table = self._ascii_tables[(full, turkic)]
+        if ascii_table is not None and text.isascii():
+            return text.encode("ascii").translate(ascii_table).decode("ascii")
+        return text.translate(self._tables[(full, turkic)])
+
+    def fold_all(self, texts: typing.Sequence[str], full: bool = True, turkic: bool = False) -> typing.List[str]:
+        table = self._tables[(full, turkic)]
+        ascii_table = self._ascii_tables[(full, turkic)]
+        if ascii_table is None:
+            return [text.translate(table) for text in texts]
+        joined = BATCH_SEPARATOR.join(texts)
+        if texts and joined.isascii() and joined.count(BATCH_SEPARATOR) == len(texts) - 1:
+            return joined.encode("ascii").translate(ascii_table).decode("ascii").split(BATCH_SEPARATOR)
+        # non-ASCII texts, or texts containing the separator
+        return [
+            text.encode("ascii").translate(ascii_table).decode("ascii") if text.isascii() else text.translate(table)
+            for text in texts
+        ]
+
+    def equal(self, text1: str, text2: str, full: bool = True, turkic: bool = False) -> bool:
+        # caseless match
+        return self.fold(text1, full, turkic) == self.fold(text2, full, turkic)
+
+    def equal_all(
+        self, pairs: typing.Sequence[typing.Tuple[str, str]], full: bool = True, turkic: bool = False
+    ) -> typing.List[bool]:
+        folded = self.fold_all([text for pair in pairs for text in pair], full, turkic)
+        return [folded[index] == folded[index + 1] for index in range(0, len(folded), 2)]
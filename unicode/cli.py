@@ -1,21 +1,39 @@
 #!/usr/bin/env python3
 
 import logging
+import typing
 
 import click
 
-from unicode.app import flask_app, configure
+from unicode.app import flask_app, build_snapshot, configure, render_static
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option("-c", "--config", default="config.py", type=click.Path(exists=True))
 @click.option("-r", "--reset", is_flag=True)
 @click.option("-v", "--verbose", is_flag=True)
-def main(config: str, reset: bool, verbose: bool,) -> None:
+@click.pass_context
+def main(ctx: click.Context, config: str, reset: bool, verbose: bool) -> None:
     if verbose:
         logging.basicConfig(level=logging.INFO)
-    configure(config, reset)
-    flask_app.run()
+    ctx.obj = {"config": config, "reset": reset}
+    if ctx.invoked_subcommand is None:
+        configure(config, reset)
+        flask_app.run()
+
+
+@main.command("build-snapshot")
+@click.pass_context
+def build_snapshot_command(ctx: click.Context) -> None:
+    build_snapshot(ctx.obj["config"], ctx.obj["reset"])
+
+
+@main.command("render-static")
+@click.option("-o", "--out", required=True, type=click.Path(file_okay=False))
+@click.option("-j", "--jobs", type=int, default=None, help="number of worker processes (default: number of CPUs)")
+@click.pass_context
+def render_static_command(ctx: click.Context, out: str, jobs: typing.Optional[int]) -> None:
+    render_static(ctx.obj["config"], ctx.obj["reset"], out, jobs)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
-import re
 import typing
 
+HEX_DIGITS = "0123456789ABCDEFabcdef"
+
 
 def code_link(code: str) -> str:
     code_upper = code.upper()
@@ -8,7 +9,7 @@ def code_link(code: str) -> str:
 
 
 def hex2id(hex_string: str) -> typing.Optional[int]:
-    if not re.match(r"^[0-9A-Fa-f]{1,6}$", hex_string):
+    if not 1 <= len(hex_string) <= 6 or hex_string.strip(HEX_DIGITS):
         return None
     return int(hex_string, 16)
 
@@ -50,10 +51,8 @@ class CodepointInfo:
 
 
 class Codepoint:
-    def __init__(self, codepoint: int, name: str, block_id: int = None):
+    def __init__(self, codepoint: int, name: str):
         self.info = CodepointInfo(codepoint, name)
-        self.block: typing.Optional[int] = block_id
-        self.subblock: typing.Optional[int] = None
         self.case: typing.Optional[int] = None
         self.alternate: typing.List[str] = []
         self.comments: typing.List[str] = []
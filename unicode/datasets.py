@@ -0,0 +1,164 @@
+import logging
+import multiprocessing
+import os
+import threading
+import typing
+
+import appdirs  # type: ignore
+from flask import Flask, g, has_request_context
+from flask_caching import Cache  # type: ignore
+from werkzeug.local import LocalProxy
+
+from unicode.download import UNICODE, fetch_data_files
+from unicode.snapshot import SNAPSHOT_TARGET, source_key
+from unicode.uinfo import UInfo
+
+# The datasets served by the app; both are replaced as a whole, so they are accessed as attributes of this module.
+# replaced by reload_dataset(); views use current_uinfo
+unicode_info = UInfo()
+# further unicode versions (UNICODE_VERSIONS), served below /v/<version>/; replaced whenever a version has been loaded
+# by load_versions()
+versions: typing.Dict[str, UInfo] = {}
+
+# held while a reload is in progress
+_reload_lock = threading.Lock()
+# held while further unicode versions are loaded
+_versions_lock = threading.Lock()
+
+# starts the parser processes of loads running next to the server's threads: forking a multi-threaded process may copy
+# locks held by other threads, so the processes are forked from a single-threaded server process instead (which imports
+# the main module, so that has to guard its entry point by `if __name__ == "__main__"`)
+_LOADER_CONTEXT = "forkserver"
+
+
+def request_uinfo() -> UInfo:
+    # the dataset a request started with, so in-flight requests finish on it while a reload swaps in a new one
+    if has_request_context() and "unicode_info" in g:
+        return typing.cast(UInfo, g.unicode_info)
+    return unicode_info
+
+
+current_uinfo = typing.cast(UInfo, LocalProxy(request_uinfo))
+
+
+def reloading() -> bool:
+    return _reload_lock.locked()
+
+
+def cache_dir(config: typing.Mapping[str, typing.Any]) -> str:
+    if "CACHE_DIR" in config:
+        return str(config["CACHE_DIR"])
+    return os.path.join(appdirs.user_cache_dir("flopp.unicode"))
+
+
+def snapshot_file(config: typing.Mapping[str, typing.Any], data_dir: str) -> str:
+    if "SNAPSHOT_FILE" in config:
+        return str(config["SNAPSHOT_FILE"])
+    return os.path.join(data_dir, SNAPSHOT_TARGET)
+
+
+def data_urls(config: typing.Mapping[str, typing.Any], unicode_version: str = UNICODE) -> typing.Dict[str, str]:
+    # DATA_URLS with "{version}" replaced by the unicode version; urls without it only apply to the default version
+    urls: typing.Dict[str, str] = config.get("DATA_URLS") or {}
+    return {
+        target: url.replace("{version}", unicode_version)
+        for target, url in urls.items()
+        if unicode_version == UNICODE or "{version}" in url
+    }
+
+
+def reload_dataset(app: Flask, cache: Cache, data_dir: str, snapshot: typing.Optional[str] = None) -> bool:
+    # Loads the dataset from `data_dir` (or the snapshot) into a new UInfo and swaps it in; returns False if the
+    # dataset is unchanged. Requests in flight finish on the old dataset, cached responses are keyed by the version.
+    global unicode_info  # pylint: disable=global-statement
+    old_info = unicode_info
+    if source_key(data_dir) == old_info.version():
+        logging.info("dataset unchanged: %s", data_dir)
+        return False
+    new_info = UInfo()
+    new_info.load(
+        data_dir,
+        snapshot,
+        app.config.get("LOAD_JOBS"),
+        lazy=True,
+        mp_context=multiprocessing.get_context(_LOADER_CONTEXT),
+    )
+    if not new_info.wait_complete():
+        raise RuntimeError(f"failed to load the dataset from {data_dir}")
+    summaries = old_info.wikipedia_summaries()
+    if summaries is not None:
+        new_info.set_wikipedia_summaries(summaries)
+    unicode_info = new_info
+    if app.config.get("RESPONSE_CACHE") == "simple":
+        # the responses of the old dataset are never hit again
+        cache.clear()
+    logging.info("swapped dataset %s -> %s", old_info.version()[:16], new_info.version()[:16])
+    # share the codepoint data with the new dataset
+    start_loading_versions(app)
+    return True
+
+
+def start_reload(
+    app: Flask, cache: Cache, data_dir: typing.Optional[str] = None, snapshot: typing.Optional[str] = None
+) -> bool:
+    # reloads in a background thread, from the configured cache directory and snapshot by default; returns False if a
+    # reload is already in progress
+    if not _reload_lock.acquire(blocking=False):  # pylint: disable=consider-using-with
+        return False
+    if data_dir is None:
+        data_dir = cache_dir(app.config)
+        snapshot = snapshot or snapshot_file(app.config, data_dir)
+
+    def reload() -> None:
+        assert data_dir is not None
+        try:
+            reload_dataset(app, cache, data_dir, snapshot)
+        except Exception:  # pylint: disable=broad-except
+            logging.exception("Failed to reload the dataset from %s", data_dir)
+        finally:
+            _reload_lock.release()
+
+    threading.Thread(target=reload, name="reload", daemon=True).start()
+    return True
+
+
+def start_loading_versions(app: Flask, reset_cache: bool = False) -> None:
+    if app.config.get("UNICODE_VERSIONS"):
+        threading.Thread(
+            target=load_versions, args=(app, unicode_info, reset_cache), name="versions", daemon=True
+        ).start()
+
+
+def load_versions(app: Flask, base: UInfo, reset_cache: bool = False) -> None:
+    # Loads the further unicode versions from "unicode-<version>" subdirectories of the cache directory, sharing
+    # unchanged codepoint data with `base`. A version is served as soon as it is loaded; until then the previously
+    # loaded one (if any) stays in use.
+    global versions  # pylint: disable=global-statement
+    with _versions_lock:
+        if not base.wait_complete():
+            return
+        for unicode_version in app.config.get("UNICODE_VERSIONS", []):
+            if unicode_version == base.unicode_version():
+                continue
+            version_dir = os.path.join(cache_dir(app.config), f"unicode-{unicode_version}")
+            version_info = UInfo(unicode_version)
+            try:
+                fetch_data_files(
+                    version_dir, reset_cache, data_urls(app.config, unicode_version), unicode_version=unicode_version
+                )
+                version_info.load(
+                    version_dir,
+                    jobs=app.config.get("LOAD_JOBS"),
+                    lazy=True,
+                    base=base,
+                    mp_context=multiprocessing.get_context(_LOADER_CONTEXT),
+                )
+                if not version_info.wait_complete():
+                    raise RuntimeError(f"failed to load the dataset from {version_dir}")
+            except Exception:  # pylint: disable=broad-except
+                logging.exception("Failed to load unicode %s", unicode_version)
+                continue
+            summaries = base.wikipedia_summaries()
+            if summaries is not None:
+                version_info.set_wikipedia_summaries(summaries)
+            versions = dict(versions, **{unicode_version: version_info})
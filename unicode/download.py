@@ -1,80 +1,212 @@
+import concurrent.futures
+import ftplib
+import hashlib
 import logging
 import os
 import pathlib
-import zipfile
+import typing
+import urllib.parse
 
 import requests
-import requests_ftp  # type: ignore
 
+from unicode.fileutil import atomic_file, read_json, write_json
 from unicode.version import __user_agent__
 
-requests_ftp.monkeypatch_session()
-
 BLOCKS_TARGET = "Blocks.txt"
 CASEFOLDING_TARGET = "CaseFolding.txt"
 CONFUSABLES_TARGET = "confusables.txt"
 HANGUL_TARGET = "hangul.txt"
 NAMESLIST_TARGET = "NamesList.txt"
-UNIHAN_READINGS_TARGET = "Unihan_Readings.txt"
 UNIHAN_TARGET = "Unihan.zip"
 WIKIPEDIA_TARGET = "wikipedia.html"
+DOWNLOAD_MANIFEST_TARGET = "downloads.json"
 
 UNICODE = "13.0.0"
-BLOCKS_URL = f"ftp://www.unicode.org/Public/{UNICODE}/ucd/Blocks.txt"
-CASEFOLDING_URL = f"ftp://www.unicode.org/Public/{UNICODE}/ucd/CaseFolding.txt"
-CONFUSABLES_URL = f"ftp://ftp.unicode.org/Public/security/{UNICODE}/confusables.txt"
+BLOCKS_URL = "ftp://www.unicode.org/Public/{version}/ucd/Blocks.txt"
+CASEFOLDING_URL = "ftp://www.unicode.org/Public/{version}/ucd/CaseFolding.txt"
+CONFUSABLES_URL = "ftp://ftp.unicode.org/Public/security/{version}/confusables.txt"
 HANGUL_URL = "https://raw.githubusercontent.com/whatwg/encoding/master/index-euc-kr.txt"
-NAMESLIST_URL = f"ftp://www.unicode.org/Public/{UNICODE}/ucd/NamesList.txt"
-UNIHAN_URL = f"ftp://www.unicode.org/Public/{UNICODE}/ucd/Unihan.zip"
+NAMESLIST_URL = "ftp://www.unicode.org/Public/{version}/ucd/NamesList.txt"
+UNIHAN_URL = "ftp://www.unicode.org/Public/{version}/ucd/Unihan.zip"
 WIKIPEDIA_URL = "https://en.wikipedia.org/wiki/Unicode_block"
 
 
-def fetch_data_files(cache_dir: str, reset_cache: bool) -> None:
-    if reset_cache:
-        for file_name in [
-            BLOCKS_TARGET,
-            CASEFOLDING_TARGET,
-            CONFUSABLES_TARGET,
-            HANGUL_TARGET,
-            NAMESLIST_TARGET,
-            UNIHAN_READINGS_TARGET,
-            UNIHAN_TARGET,
-            WIKIPEDIA_TARGET,
-        ]:
-            path = os.path.join(cache_dir, file_name)
-            if os.path.isfile(path):
-                os.remove(path)
-    download(BLOCKS_URL, os.path.join(cache_dir, BLOCKS_TARGET))
-    download(CASEFOLDING_URL, os.path.join(cache_dir, CASEFOLDING_TARGET))
-    download(CONFUSABLES_URL, os.path.join(cache_dir, CONFUSABLES_TARGET))
-    download(HANGUL_URL, os.path.join(cache_dir, HANGUL_TARGET))
-    download(NAMESLIST_URL, os.path.join(cache_dir, NAMESLIST_TARGET))
-    download(UNIHAN_URL, os.path.join(cache_dir, UNIHAN_TARGET))
-    download(WIKIPEDIA_URL, os.path.join(cache_dir, WIKIPEDIA_TARGET))
-    unzip(os.path.join(cache_dir, UNIHAN_TARGET), cache_dir)
-
-
-def download(url: str, cache_file_name: str) -> None:
-    if os.path.isfile(cache_file_name):
-        return
+def data_files(unicode_version: str = UNICODE) -> typing.Dict[str, str]:
+    # target file name -> url for the given unicode version
+    return {
+        BLOCKS_TARGET: BLOCKS_URL.format(version=unicode_version),
+        CASEFOLDING_TARGET: CASEFOLDING_URL.format(version=unicode_version),
+        CONFUSABLES_TARGET: CONFUSABLES_URL.format(version=unicode_version),
+        HANGUL_TARGET: HANGUL_URL,
+        NAMESLIST_TARGET: NAMESLIST_URL.format(version=unicode_version),
+        UNIHAN_TARGET: UNIHAN_URL.format(version=unicode_version),
+        WIKIPEDIA_TARGET: WIKIPEDIA_URL,
+    }
+
+
+DATA_FILES = data_files()
+
+DOWNLOAD_WORKERS = 4
+DOWNLOAD_TIMEOUT = 60
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+# manifest entry of a downloaded file: url, sha256, size, mtime_ns, etag, last_modified
+# sha256 and size are a fingerprint of the file as it was downloaded, which detects changes to the cached file; the
+# servers publish no checksums to verify the download against (only its size is checked against the announced one).
+# While size and modification time are unchanged, the file is assumed unchanged and its sha256 is not computed again.
+EntryT = typing.Dict[str, typing.Any]
+
+DOWNLOAD_ERRORS = (OSError, RuntimeError, requests.RequestException, ftplib.Error)
+
+
+def fetch_data_files(
+    cache_dir: str,
+    reset_cache: bool,
+    urls: typing.Optional[typing.Mapping[str, str]] = None,
+    workers: int = DOWNLOAD_WORKERS,
+    unicode_version: str = UNICODE,
+) -> None:
+    # Downloads missing (or locally modified) data files. With reset_cache all files are refreshed, using conditional
+    # requests, so only files that changed on the server are transferred; a failed refresh keeps the cached file. `urls`
+    # overrides the urls of the unicode version.
+    files = dict(data_files(unicode_version), **(urls or {}))
+    pathlib.Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    manifest_file = os.path.join(cache_dir, DOWNLOAD_MANIFEST_TARGET)
+    manifest: typing.Dict[str, EntryT] = read_json(manifest_file, {})
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="download") as executor:
+        futures = {
+            target: executor.submit(download, url, os.path.join(cache_dir, target), manifest.get(target), reset_cache)
+            for target, url in files.items()
+        }
+    errors = []
+    for target, future in futures.items():
+        try:
+            manifest[target] = future.result()
+        except DOWNLOAD_ERRORS as error:
+            errors.append(error)
+    write_json(manifest_file, manifest, indent=2, sort_keys=True)
+    if errors:
+        raise RuntimeError(f"failed to download data files: {'; '.join(str(error) for error in errors)}")
 
-    logging.info("downloading: %s", url)
-    if url.startswith("ftp:"):
-        ftp_session = requests.Session()
-        res = ftp_session.get(url)
-    else:
-        res = requests.get(url, headers={"user-agent": __user_agent__})
 
-    if res.status_code == requests.codes.ok:
-        data = res.content
+def download(url: str, cache_file_name: str, entry: typing.Optional[EntryT] = None, refresh: bool = False) -> EntryT:
+    # returns the manifest entry of the (possibly unchanged) file
+    if os.path.isfile(cache_file_name):
+        if entry is None or entry.get("url") != url:
+            # downloaded before there was a manifest
+            entry = {"url": url, "etag": None, "last_modified": None, **_fingerprint(cache_file_name)}
+        else:
+            fingerprint = _fingerprint(cache_file_name, entry)
+            if fingerprint["sha256"] != entry["sha256"]:
+                logging.warning("cached file changed since its download, downloading again: %s", cache_file_name)
+                entry = None
+            else:
+                entry = dict(entry, **fingerprint)
+        if entry is not None and not refresh:
+            return entry
     else:
-        raise RuntimeError(f"downloading {url} yields {res.status_code}")
+        entry = None
 
+    logging.info("downloading: %s" if entry is None else "refreshing: %s", url)
     pathlib.Path(os.path.dirname(cache_file_name)).mkdir(parents=True, exist_ok=True)
-    with open(cache_file_name, "wb") as f:
-        f.write(data)
+    try:
+        if urllib.parse.urlsplit(url).scheme == "ftp":
+            new_entry = _download_ftp(url, cache_file_name, entry)
+        else:
+            new_entry = _download_http(url, cache_file_name, entry)
+    except DOWNLOAD_ERRORS as error:
+        if entry is None:
+            raise
+        # a failed refresh is no reason to give up the cached file
+        logging.warning("failed to refresh %s, keeping the cached file: %s", url, error)
+        return entry
+    if new_entry is None:
+        logging.info("not modified: %s", url)
+        assert entry is not None
+        return entry
+    return new_entry
+
+
+def _download_http(url: str, cache_file_name: str, entry: typing.Optional[EntryT]) -> typing.Optional[EntryT]:
+    # returns None if the file has not been modified
+    headers = {"user-agent": __user_agent__}
+    if entry is not None:
+        if entry.get("etag"):
+            headers["if-none-match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["if-modified-since"] = entry["last_modified"]
+    with requests.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as res:
+        if res.status_code == requests.codes.not_modified and entry is not None:
+            return None
+        if res.status_code != requests.codes.ok:
+            raise RuntimeError(f"downloading {url} yields {res.status_code}")
+        # the content length refers to the encoded content, which is decoded while streaming
+        content_length = res.headers.get("content-length")
+        size = int(content_length) if content_length and res.headers.get("content-encoding") is None else None
+        fingerprint = _write_atomically(url, cache_file_name, res.iter_content(DOWNLOAD_CHUNK_SIZE), size)
+        etag = res.headers.get("etag")
+        last_modified = res.headers.get("last-modified")
+    return {"url": url, "etag": etag, "last_modified": last_modified, **fingerprint}
+
+
+def _download_ftp(url: str, cache_file_name: str, entry: typing.Optional[EntryT]) -> typing.Optional[EntryT]:
+    # FTP has no conditional requests; the modification time (MDTM) is compared instead
+    parts = urllib.parse.urlsplit(url)
+    with ftplib.FTP(timeout=DOWNLOAD_TIMEOUT) as ftp:
+        ftp.connect(parts.hostname or "", parts.port or ftplib.FTP_PORT)
+        ftp.login(urllib.parse.unquote(parts.username or "anonymous"), urllib.parse.unquote(parts.password or ""))
+        path = urllib.parse.unquote(parts.path)
+        try:
+            last_modified: typing.Optional[str] = ftp.sendcmd(f"MDTM {path}").split()[-1]
+        except ftplib.error_perm:
+            last_modified = None
+        if entry is not None and last_modified is not None and entry.get("last_modified") == last_modified:
+            return None
+        ftp.voidcmd("TYPE I")
+        try:
+            size: typing.Optional[int] = ftp.size(path)
+        except ftplib.error_perm:
+            size = None
+
+        def chunks() -> typing.Iterator[bytes]:
+            with ftp.transfercmd(f"RETR {path}") as connection:
+                yield from iter(lambda: connection.recv(DOWNLOAD_CHUNK_SIZE), b"")
+            ftp.voidresp()
+
+        fingerprint = _write_atomically(url, cache_file_name, chunks(), size)
+    return {"url": url, "etag": None, "last_modified": last_modified, **fingerprint}
+
+
+def _write_atomically(
+    url: str, file_name: str, chunks: typing.Iterable[bytes], expected_size: typing.Optional[int]
+) -> EntryT:
+    # streams the chunks to a temporary file, which replaces `file_name` once complete; returns the fingerprint
+    file_hash = hashlib.sha256()
+    size = 0
+    with atomic_file(file_name) as f:
+        for chunk in chunks:
+            file_hash.update(chunk)
+            size += len(chunk)
+            f.write(chunk)
+        if expected_size is not None and size != expected_size:
+            raise RuntimeError(f"downloading {url} yields {size} instead of {expected_size} bytes")
+    return {"sha256": file_hash.hexdigest(), "size": size, "mtime_ns": os.stat(file_name).st_mtime_ns}
+
+
+def cached_sha256(file_name: str, entry: typing.Optional[EntryT] = None) -> str:
+    # the sha256 of the file, taken from its manifest entry while size and modification time match
+    return str(_fingerprint(file_name, entry)["sha256"])
 
 
-def unzip(zip_file_name: str, target_dir: str) -> None:
-    with zipfile.ZipFile(zip_file_name, "r") as f:
-        f.extractall(target_dir)
+def _fingerprint(file_name: str, entry: typing.Optional[EntryT] = None) -> EntryT:
+    stat = os.stat(file_name)
+    if entry is not None and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+        return {"sha256": entry["sha256"], "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    file_hash = hashlib.sha256()
+    size = 0
+    with open(file_name, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            file_hash.update(chunk)
+            size += len(chunk)
+    return {"sha256": file_hash.hexdigest(), "size": size, "mtime_ns": stat.st_mtime_ns}
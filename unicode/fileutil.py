@@ -0,0 +1,42 @@
+import contextlib
+import json
+import logging
+import os
+import typing
+
+T = typing.TypeVar("T")
+
+
+@contextlib.contextmanager
+def atomic_file(file_name: str) -> typing.Iterator[typing.BinaryIO]:
+    # writes to a temporary file, which replaces `file_name` once the block completes; removed if the block fails
+    tmp_file_name = f"{file_name}.tmp{os.getpid()}"
+    try:
+        with open(tmp_file_name, "wb") as f:
+            yield f
+        os.replace(tmp_file_name, file_name)
+    finally:
+        if os.path.isfile(tmp_file_name):
+            os.remove(tmp_file_name)
+
+
+def write_atomically(file_name: str, data: bytes) -> None:
+    with atomic_file(file_name) as f:
+        f.write(data)
+
+
+def read_json(file_name: str, default: T) -> T:
+    # returns `default` if the file is missing, unreadable or holds a value of another type than `default`
+    if not os.path.isfile(file_name):
+        return default
+    try:
+        with open(file_name, encoding="utf-8") as f:
+            value = json.load(f)
+    except (OSError, ValueError) as error:
+        logging.warning("Failed to read %s: %s", file_name, error)
+        return default
+    return value if isinstance(value, type(default)) else default
+
+
+def write_json(file_name: str, value: typing.Any, **kwargs: typing.Any) -> None:
+    write_atomically(file_name, json.dumps(value, **kwargs).encode("utf-8"))
@@ -0,0 +1,323 @@
+import array
+import concurrent.futures
+import logging
+import multiprocessing.context
+import os
+import re
+import time
+import typing
+
+from unicode.block import Block, BlockTable, IntervalIndex, Subblock, normalize_block_name
+from unicode.casefold import CaseFolding
+from unicode.codepoint import code_link, hex2id
+from unicode.parsers import (
+    UPPER_HEX_DIGITS,
+    CaseFoldingT,
+    ConfusablesT,
+    parse_casefolding,
+    parse_code,
+    parse_confusables,
+    parse_hangul,
+    parse_unihan,
+    parse_wikipedia,
+    read_lines,
+)
+from unicode.search import NameIndex
+from unicode.skeleton import SkeletonTable
+from unicode.store import CodepointStore, CodepointStoreBuilder
+from unicode.suggest import SuggestIndex
+
+ParsedT = typing.TypeVar("ParsedT")
+
+# blocks the random characters of the welcome page are taken from
+RANDOM_BLOCKS = [
+    0x0180,
+    0x0250,
+    0x1F600,
+    0x1F0A0,
+    0x1F680,
+    0x0370,
+    0x0900,
+    0x0700,
+    0x0400,
+    0x2200,
+    0x2190,
+]
+
+
+class Dataset:
+    # Everything loaded from the data files. UInfo replaces its dataset as a whole, so a dataset is never modified once
+    # it is in use (apart from the wikipedia summaries attached to the blocks on access).
+
+    def __init__(self) -> None:
+        self.blocks = BlockTable()
+        self.codepoints = CodepointStore()
+        self.random_candidates = array.array("I")
+        self.name_index = NameIndex()
+        self.suggest_index = SuggestIndex()
+        self.skeletons = SkeletonTable()
+        self.case_folding = CaseFolding()
+        # False while the secondary datasets (confusables, case folding, Unihan, hangul, wikipedia) are missing
+        self.complete = False
+
+
+def start_secondary_parsers(
+    cache_dir: str, jobs: typing.Optional[int], mp_context: typing.Optional[multiprocessing.context.BaseContext]
+) -> typing.Tuple[concurrent.futures.Executor, typing.Dict[str, concurrent.futures.Future]]:
+    parsers: typing.Dict[str, typing.Tuple[typing.Callable[..., typing.Any], typing.Tuple[str, ...]]] = {
+        "confusables": (parse_confusables, (os.path.join(cache_dir, "confusables.txt"),)),
+        "casefolding": (parse_casefolding, (os.path.join(cache_dir, "CaseFolding.txt"),)),
+        "unihan": (parse_unihan, (os.path.join(cache_dir, "Unihan.zip"), "Unihan_Readings.txt")),
+        "hangul": (parse_hangul, (os.path.join(cache_dir, "hangul.txt"),)),
+        "wikipedia": (parse_wikipedia, (os.path.join(cache_dir, "wikipedia.html"),)),
+    }
+    # forked workers are started up front, each a copy of the parent: more workers than files would only cost memory
+    executor = concurrent.futures.ProcessPoolExecutor(
+        min(jobs or os.cpu_count() or 1, len(parsers)), mp_context=mp_context
+    )
+    return executor, {name: executor.submit(_timed, parser, *args) for name, (parser, args) in parsers.items()}
+
+
+def _timed(func: typing.Callable[..., ParsedT], *args: str) -> typing.Tuple[ParsedT, float]:
+    # runs in a worker process; returns the result and the elapsed time
+    start_time = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start_time
+
+
+def merge_secondary(data: Dataset, codepoints: CodepointStoreBuilder, parsed: typing.Dict[str, typing.Any]) -> None:
+    # parsed: name -> parser result
+    _merge_confusables(codepoints, parsed["confusables"])
+    data.skeletons = SkeletonTable(parsed["confusables"][2])
+    _merge_casefolding(codepoints, parsed["casefolding"])
+    data.case_folding = CaseFolding(parsed["casefolding"][1])
+    _merge_unihan(codepoints, parsed["unihan"])
+    _merge_hangul(codepoints, parsed["hangul"])
+    _merge_wikipedia(data, parsed["wikipedia"])
+
+
+def finish(data: Dataset, codepoints: CodepointStoreBuilder) -> None:
+    # the indexes depending on the blocks of the built store
+    data.blocks.block_index = codepoints.blocks()
+    _index_block_names(data.blocks)
+    _determine_prev_next_blocks(data)
+    _determine_random_candidates(data)
+
+
+def load_blocks(data: Dataset, file_name: str) -> None:
+    blocks = data.blocks.by_id
+    if blocks:
+        return
+    with open(file_name, "r", encoding="utf-8") as blocks_file:
+        for line in blocks_file:
+            line = line.strip()
+            if line.startswith("#") or line == "":
+                continue
+            match = re.split(r"\.\.|;\s+", line)
+            if len(match) != 3:
+                continue
+            range_from = hex2id(match[0])
+            assert range_from is not None
+            range_to = hex2id(match[1])
+            assert range_to is not None
+            name = match[2]
+            blocks[range_from] = Block(range_from, range_to, name)
+
+
+def load_nameslist(data: Dataset, file_name: str) -> CodepointStoreBuilder:
+    codepoints = _initialize_codepoints(data.blocks)
+
+    data.blocks.subblocks = {}
+    subblocks = data.blocks.subblocks
+    codepoint_id: typing.Optional[int] = None
+    codepoint = None
+    subblock = None
+    blockend = None
+    for line in read_lines(file_name):
+        first = line[:1]
+        if first and first in UPPER_HEX_DIGITS:
+            # <code>\t<name>
+            hex_name = line.split("\t")
+            if len(hex_name) < 2 or parse_code(hex_name[0], UPPER_HEX_DIGITS) is None:
+                continue
+            codepoint_id = hex2id(hex_name[0])
+            if codepoint_id is None or codepoint_id > 0x10FFFF:
+                raise ValueError(f"invalid code in line: {line}")
+            codepoint = codepoints.get(codepoint_id)
+            assert codepoint
+            codepoint.set_name(hex_name[1].strip())
+        elif first == "\t":
+            second = line[1:2]
+            if second == "=":
+                assert codepoint
+                codepoint.alternate.append(line[2:].strip())
+            elif second == "*":
+                assert codepoint
+                codepoint.comments.append(line[2:].strip())
+            elif second == "x":
+                # \tx (<name> - <code>) or \tx <code>
+                if line.startswith("\tx (") and line.endswith(")") and " - " in line:
+                    related_hex = line[line.rfind(" - ") + 3 : -1]
+                else:
+                    related_hex = line[3:] if line.startswith("\tx ") else ""
+                codepoint_id2 = parse_code(related_hex, UPPER_HEX_DIGITS)
+                if codepoint_id2 is None:
+                    logging.info("strange related: %s", line)
+                    continue
+                if codepoint_id2 > 0x10FFFF:
+                    raise ValueError(f"invalid code in line: {line}")
+                assert codepoint
+                codepoint.related.append(codepoint_id2)
+        elif line.startswith("@@\t"):
+            if subblock is not None:
+                subblocks[subblock].set_to_codepoint(blockend)
+            subblock = None
+            block_range = _load_block_header(data.blocks, codepoints, line)
+            if block_range is None:
+                continue
+            codepoint_id = block_range[0] - 1
+            blockend = block_range[1]
+        elif line.startswith("@\t\t"):
+            assert codepoint_id is not None
+            if subblock is not None:
+                subblocks[subblock].set_to_codepoint(codepoint_id)
+            subblock = codepoint_id + 1
+            subblocks[subblock] = Subblock(subblock, None, line[3:].strip())
+    if subblock is not None:
+        subblocks[subblock].set_to_codepoint(blockend)
+    _index_subblocks(data.blocks)
+    _detect_codes_in_comments(codepoints)
+    return codepoints
+
+
+def _load_block_header(
+    blocks: BlockTable, codepoints: CodepointStoreBuilder, line: str
+) -> typing.Optional[typing.Tuple[int, int]]:
+    # @@\t<from>\t<name>\t<to>; returns the first and last codepoint of the block, adding blocks missing in Blocks.txt
+    name_start = line.find("\t", 3) + 1
+    name_end = line.rfind("\t")
+    from_hex, to_hex = line[3 : name_start - 1], line[name_end + 1 :]
+    block_id = parse_code(from_hex, UPPER_HEX_DIGITS)
+    range_to = parse_code(to_hex, UPPER_HEX_DIGITS)
+    if name_start == 0 or name_end < name_start or block_id is None or range_to is None:
+        logging.info("bad block header: %s", line)
+        return None
+    if block_id in blocks.by_id:
+        return block_id, blocks.by_id[block_id].to_codepoint()
+    block_name = line[name_start:name_end]
+    logging.info("unknown block: %s-%s: %s", from_hex, to_hex, block_name)
+    codepoints.add_block(block_id, range_to)
+    blocks.by_id[block_id] = Block(block_id, range_to, block_name)
+    return block_id, range_to
+
+
+def _initialize_codepoints(blocks: BlockTable) -> CodepointStoreBuilder:
+    if not blocks.by_id:
+        raise RuntimeError("blocks not initialized, yet!")
+    codepoints = CodepointStoreBuilder()
+    for block in blocks.by_id.values():
+        codepoints.add_block(block.from_codepoint(), block.to_codepoint())
+    return codepoints
+
+
+def _index_subblocks(blocks: BlockTable) -> None:
+    blocks.subblock_index = IntervalIndex()
+    for subblock in blocks.subblocks.values():
+        to_codepoint = subblock.to_codepoint()
+        assert to_codepoint is not None
+        blocks.subblock_index.add(subblock.from_codepoint(), to_codepoint)
+
+
+def _index_block_names(blocks: BlockTable) -> None:
+    blocks.names = {}
+    for block_id, block in blocks.by_id.items():
+        blocks.names.setdefault(normalize_block_name(block.name()), block_id)
+
+
+def _detect_codes_in_comments(codepoints: CodepointStoreBuilder) -> None:
+    re_hex = re.compile(r"\b[0-9A-F]{4,6}\b")
+    for codepoint in codepoints.touched():
+        if not codepoint.comments:
+            continue
+        new_comments = []
+        for comment in codepoint.comments:
+            replacements = []
+            for hex_id in re_hex.findall(comment):
+                if codepoints.contains(hex2id(hex_id.lower())):
+                    replacements.append((hex_id, code_link(hex_id.lower())))
+            for replacement in replacements:
+                comment = comment.replace(replacement[0], replacement[1])
+            new_comments.append(comment)
+        codepoint.comments = new_comments
+
+
+def _merge_confusables(codepoints: CodepointStoreBuilder, parsed: ConfusablesT) -> None:
+    confusable_sets, combinables, _ = parsed
+    for codepoint_id, combinable in combinables:
+        codepoint = codepoints.get(codepoint_id)
+        assert codepoint
+        codepoint.combinables.append(combinable)
+    for confusable_set in confusable_sets:
+        for codepoint_id1 in confusable_set:
+            confusables = []
+            for codepoint_id2 in confusable_set:
+                if codepoint_id2 != codepoint_id1:
+                    confusables.append(codepoint_id2)
+            codepoint = codepoints.get(codepoint_id1)
+            assert codepoint
+            codepoint.confusables = confusables
+
+
+def _merge_casefolding(codepoints: CodepointStoreBuilder, parsed: CaseFoldingT) -> None:
+    pairs, _ = parsed
+    for codepoint_id1, codepoint_id2 in pairs:
+        codepoint1 = codepoints.get(codepoint_id1)
+        assert codepoint1
+        codepoint1.case = codepoint_id2
+
+        codepoint2 = codepoints.get(codepoint_id2)
+        assert codepoint2
+        codepoint2.case = codepoint_id1
+
+
+def _merge_unihan(codepoints: CodepointStoreBuilder, definitions: typing.List[typing.Tuple[int, str]]) -> None:
+    for codepoint_id, definition in definitions:
+        codepoint = codepoints.get(codepoint_id)
+        assert codepoint is not None
+        codepoint.set_name(definition)
+
+
+def _merge_hangul(codepoints: CodepointStoreBuilder, names: typing.List[typing.Tuple[int, str]]) -> None:
+    for codepoint_id, name in names:
+        codepoint = codepoints.get(codepoint_id)
+        assert codepoint is not None
+        if codepoint.name() == "<unassigned>":
+            codepoint.set_name(name)
+
+
+def _merge_wikipedia(data: Dataset, urls: typing.List[typing.Tuple[int, str]]) -> None:
+    for range_from, url in urls:
+        block = data.blocks.by_id.get(range_from)
+        if block:
+            block.wikipedia = url
+
+
+def _determine_prev_next_blocks(data: Dataset) -> None:
+    blocks = data.blocks.by_id
+    data.blocks.infos = []
+    last_block_id = None
+    for block_id in data.codepoints.iter_block_ids():
+        if block_id != last_block_id:
+            if last_block_id is not None:
+                blocks[last_block_id].next = block_id
+            blocks[block_id].prev = last_block_id
+            blocks[block_id].next = None
+            data.blocks.infos.append(blocks[block_id].info)
+            last_block_id = block_id
+
+
+def _determine_random_candidates(data: Dataset) -> None:
+    data.random_candidates = array.array("I")
+    for block_id in RANDOM_BLOCKS:
+        if block_id in data.blocks.by_id:
+            data.random_candidates.extend(data.blocks.by_id[block_id].codepoints_iter())
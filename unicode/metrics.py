@@ -0,0 +1,180 @@
+import os
+import resource
+import sys
+import threading
+import time
+import typing
+
+# Minimal Prometheus metrics (text exposition format 0.0.4). Metrics are kept per process, so with several worker
+# processes each one reports its own values.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0.0, 1.0, 10.0, 100.0, 1000.0, 10000.0)
+
+LabelsT = typing.Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _format_labels(names: typing.Sequence[str], values: typing.Sequence[str]) -> str:
+    if not names:
+        return ""
+    escaped = [value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in values]
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: typing.Sequence[str] = ()) -> None:
+        self.name = name
+        self._documentation = documentation
+        self._labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def render(self) -> typing.List[str]:
+        lines = [f"# HELP {self.name} {self._documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> typing.List[str]:
+        raise NotImplementedError()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: typing.Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: typing.Dict[LabelsT, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def _samples(self) -> typing.List[str]:
+        return [
+            f"{self.name}{_format_labels(self._labels, labels)} {_format_value(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: typing.Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: typing.Dict[LabelsT, float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def _samples(self) -> typing.List[str]:
+        return [
+            f"{self.name}{_format_labels(self._labels, labels)} {_format_value(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: typing.Sequence[str] = (),
+        buckets: typing.Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self._buckets = tuple(buckets) + (float("inf"),)
+        # labels -> (non-cumulative bucket counts, sum)
+        self._values: typing.Dict[LabelsT, typing.Tuple[typing.List[int], float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = next(i for i, bound in enumerate(self._buckets) if value <= bound)
+        with self._lock:
+            counts, total = self._values.get(labels, ([0] * len(self._buckets), 0.0))
+            counts[index] += 1
+            self._values[labels] = (counts, total + value)
+
+    def _samples(self) -> typing.List[str]:
+        lines = []
+        names = self._labels + ("le",)
+        for labels, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self._buckets, counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(names, labels + (_format_value(bound),))} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(self._labels, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self._labels, labels)} {cumulative}")
+        return lines
+
+
+MetricT = typing.TypeVar("MetricT", bound=_Metric)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: typing.List[_Metric] = []
+
+    def register(self, metric: MetricT) -> MetricT:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.register(
+    Histogram("unicode_http_request_duration_seconds", "HTTP request latency.", ["route", "method", "status"])
+)
+SEARCH_SECONDS = REGISTRY.register(Histogram("unicode_search_duration_seconds", "Search latency.", ["kind"]))
+SEARCH_RESULTS = REGISTRY.register(
+    Histogram("unicode_search_results", "Number of search results.", ["kind"], buckets=COUNT_BUCKETS)
+)
+CACHE_REQUESTS = REGISTRY.register(
+    Counter("unicode_cache_requests_total", "Lookups of memoized functions.", ["function", "result"])
+)
+WIKIPEDIA_FETCH_SECONDS = REGISTRY.register(
+    Histogram("unicode_wikipedia_fetch_duration_seconds", "Wikipedia summary fetch latency.")
+)
+WIKIPEDIA_FETCH_FAILURES = REGISTRY.register(
+    Counter("unicode_wikipedia_fetch_failures_total", "Failed wikipedia summary fetches.")
+)
+LOAD_SECONDS = REGISTRY.register(Gauge("unicode_load_duration_seconds", "Duration of the data load stages.", ["stage"]))
+MEMORY_BYTES = REGISTRY.register(Gauge("process_resident_memory_bytes", "Resident memory size in bytes."))
+MAX_MEMORY_BYTES = REGISTRY.register(Gauge("process_max_resident_memory_bytes", "Peak resident memory size in bytes."))
+
+
+def observe_search(kind: str, start_time: float, results: int) -> None:
+    # `start_time` as by time.perf_counter()
+    SEARCH_SECONDS.observe(time.perf_counter() - start_time, kind)
+    SEARCH_RESULTS.observe(results, kind)
+
+
+def update_process_metrics() -> None:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB elsewhere
+    MAX_MEMORY_BYTES.set(max_rss if sys.platform == "darwin" else max_rss * 1024)
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            MEMORY_BYTES.set(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE"))
+    except (OSError, ValueError, IndexError):
+        # no procfs
+        pass
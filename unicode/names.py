@@ -0,0 +1,75 @@
+import re
+import typing
+
+from unicode.codepoint import CodepointInfo, hex2id
+from unicode.search import NameIndex, decode_cursor, encode_cursor
+from unicode.store import CodepointStore
+from unicode.suggest import SuggestIndex
+
+
+def _split_keywords(keyword: str) -> typing.List[str]:
+    keywords: typing.List[str] = []
+    for word in keyword.upper().split():
+        word = word.strip()
+        if word != "":
+            keywords.append(word)
+    return keywords
+
+
+class NameSearch:
+    # Searching the codepoints of a dataset by name, code or character.
+
+    def __init__(self, codepoints: CodepointStore, name_index: NameIndex, suggest_index: SuggestIndex) -> None:
+        self._codepoints = codepoints
+        self._name_index = name_index
+        self._suggest_index = suggest_index
+
+    def search_by_name(
+        self, keyword: str, limit: int
+    ) -> typing.Tuple[typing.List[CodepointInfo], typing.Optional[str]]:
+        matches, message = self.search_direct(keyword)
+        if len(matches) > 0:
+            return matches, message
+
+        matches, _, total = self.search_ranked(keyword, limit)
+        if total == 0:
+            matches = self.search_fuzzy(keyword, limit)
+            return matches, "No exact matches, showing similar names." if matches else None
+        return matches, f"Showing the best {limit} of {total} matches" if total > limit else None
+
+    def search_ranked(
+        self, keyword: str, limit: int, cursor: typing.Optional[str] = None
+    ) -> typing.Tuple[typing.List[CodepointInfo], typing.Optional[str], int]:
+        # returns the best `limit` matches following `cursor`, the cursor of the next page and the total number of
+        # matches; raises ValueError for invalid cursors
+        after = decode_cursor(cursor) if cursor else None
+        keys, total = self._name_index.search(_split_keywords(keyword), limit + 1, after)
+        next_cursor = encode_cursor(keys[limit - 1]) if len(keys) > limit else None
+        matches = list(filter(None, [self._codepoints.get_info(key[2]) for key in keys[:limit]]))
+        return matches, next_cursor, total
+
+    def suggest(self, prefix: str, limit: int) -> typing.List[typing.Tuple[str, str, int]]:
+        return self._suggest_index.suggest(prefix, limit)
+
+    def search_fuzzy(self, keyword: str, limit: int) -> typing.List[CodepointInfo]:
+        codepoint_ids = self._name_index.search_fuzzy(_split_keywords(keyword), limit)
+        return list(filter(None, [self._codepoints.get_info(codepoint_id) for codepoint_id in codepoint_ids]))
+
+    def search_direct(self, keyword: str) -> typing.Tuple[typing.List[CodepointInfo], typing.Optional[str]]:
+        if len(keyword) == 1:
+            result = self._codepoints.get_info(ord(keyword))
+            assert result
+            return [result], "Direct character match."
+        keyword = keyword.strip()
+        if not keyword:
+            return [], "Empty query :("
+        if len(keyword) == 1:
+            result = self._codepoints.get_info(ord(keyword))
+            assert result
+            return [result], "Direct character match."
+        match = re.match(r"^U?\+?([0-9A-F]{1,6})$", keyword, re.IGNORECASE)
+        if match:
+            codepoint_info = self._codepoints.get_info(hex2id(match.group(1)))
+            if codepoint_info:
+                return [codepoint_info], "Direct codepoint match."
+        return [], "No direct match"
@@ -0,0 +1,150 @@
+import io
+import re
+import typing
+import zipfile
+
+from unicode.codepoint import HEX_DIGITS, hex2id
+
+# Parsers for the data files that only depend on the file itself. They return compact, picklable records, so they
+# can run in worker processes; UInfo merges the records into its model.
+# The (large) UCD files are read in bulk and parsed without regexes: lines are dispatched on their first character, hex
+# codes are validated by stripping the hex digits.
+
+UPPER_HEX_DIGITS = "0123456789ABCDEF"
+
+# (confusable sets, (codepoint, combinable sequence) pairs, (codepoint, prototype) pairs)
+ConfusablesT = typing.Tuple[
+    typing.List[typing.List[int]], typing.List[typing.Tuple[int, typing.List[int]]], typing.List[typing.Tuple[int, str]]
+]
+# ((codepoint, simple case folding) pairs of the common foldings, (codepoint, status, folding) of all foldings)
+CaseFoldingT = typing.Tuple[typing.List[typing.Tuple[int, int]], typing.List[typing.Tuple[int, str, str]]]
+
+
+def parse_code(hex_string: str, digits: str = HEX_DIGITS) -> typing.Optional[int]:
+    # parses a codepoint given by 4 to 6 hex digits; None if `hex_string` is not such a code
+    if 4 <= len(hex_string) <= 6 and not hex_string.strip(digits):
+        return int(hex_string, 16)
+    return None
+
+
+def read_lines(file_name: str) -> typing.List[str]:
+    with open(file_name, encoding="utf-8") as f:
+        return f.read().split("\n")
+
+
+def parse_confusables(file_name: str) -> ConfusablesT:
+    # returns the sets of mutually confusable codepoints, the (codepoint, combinable sequence) pairs and the
+    # (codepoint, prototype) pairs of the UTS #39 skeleton mapping
+    sets: typing.Dict[int, typing.List[int]] = {}
+    combinables: typing.List[typing.Tuple[int, typing.List[int]]] = []
+    prototypes: typing.List[typing.Tuple[int, str]] = []
+    for line in read_lines(file_name):
+        line = line.strip()
+        if not line or line[0] not in HEX_DIGITS:
+            continue
+        # <source> ; <target> ... ; MA # comment
+        fields = line.split(";", 3)
+        if len(fields) < 3 or not fields[2].lstrip().startswith("MA"):
+            continue
+        codepoint_id1 = parse_code(fields[0].strip())
+        targets = [parse_code(target) for target in fields[1].split()]
+        if codepoint_id1 is None or not targets or None in targets:
+            continue
+        prototype = [target for target in targets if target is not None and target <= 0x10FFFF]
+        if codepoint_id1 <= 0x10FFFF and len(prototype) == len(targets):
+            prototypes.append((codepoint_id1, "".join(map(chr, prototype))))
+        if len(targets) > 4:
+            continue
+        if len(targets) == 1:
+            codepoint_id2 = targets[0]
+            assert codepoint_id2 is not None
+            if codepoint_id1 > codepoint_id2:
+                codepoint_id1, codepoint_id2 = codepoint_id2, codepoint_id1
+            if codepoint_id1 not in sets:
+                sets[codepoint_id1] = [codepoint_id1]
+            sets[codepoint_id1].append(codepoint_id2)
+        else:
+            combinables.append((codepoint_id1, [target for target in targets if target]))
+    return list(sets.values()), combinables, prototypes
+
+
+def parse_casefolding(file_name: str) -> CaseFoldingT:
+    # returns the (codepoint, case folded codepoint) pairs of the common case foldings and the
+    # (codepoint, status, case folded string) triples of all foldings (status C, F, S or T)
+    pairs = []
+    foldings = []
+    for line in read_lines(file_name):
+        line = line.strip()
+        if not line or line[0] not in HEX_DIGITS:
+            continue
+        # <code>; <status>; <mapping>; # <name>
+        fields = line.split("; ", 3)
+        if len(fields) != 4 or fields[1] not in ("C", "F", "S", "T") or not fields[3].startswith("#"):
+            continue
+        codepoint_id1 = parse_code(fields[0])
+        targets = [parse_code(target) for target in fields[2].split()]
+        if codepoint_id1 is None or not targets or None in targets:
+            continue
+        folding = [target for target in targets if target is not None and target <= 0x10FFFF]
+        if codepoint_id1 <= 0x10FFFF and len(folding) == len(targets):
+            foldings.append((codepoint_id1, fields[1], "".join(map(chr, folding))))
+        if fields[1] == "C" and len(folding) == 1:
+            pairs.append((codepoint_id1, folding[0]))
+    return pairs, foldings
+
+
+def parse_unihan(zip_file_name: str, member: str) -> typing.List[typing.Tuple[int, str]]:
+    # returns the (codepoint, definition) pairs; the member is streamed line by line, without extracting it
+    definitions = []
+    with zipfile.ZipFile(zip_file_name, "r") as zip_file, zip_file.open(member, "r") as member_file:
+        for line in io.TextIOWrapper(member_file, encoding="utf-8"):
+            # U+<code>\tkDefinition\t<definition>
+            if "\tkDefinition\t" not in line:
+                continue
+            fields = line.strip().split("\t", 2)
+            if len(fields) != 3 or fields[1] != "kDefinition" or not fields[0].startswith("U+"):
+                continue
+            codepoint_id = parse_code(fields[0][2:])
+            if codepoint_id is not None and codepoint_id <= 0x10FFFF:
+                definitions.append((codepoint_id, fields[2]))
+    return definitions
+
+
+def parse_hangul(file_name: str) -> typing.List[typing.Tuple[int, str]]:
+    # returns the (codepoint, name) pairs
+    names = []
+    with open(file_name, "r", encoding="utf-8") as hangul_file:
+        #   423	0xAE28	긨 (HANGUL SYLLABLE GYISS)
+        re_definition = re.compile(r"^\s*[0-9]+\s*0x([0-9A-Fa-f]{4,6})\s+.*\((.+)\)\s*$")
+        for line in hangul_file:
+            line = line.strip()
+            match = re_definition.match(line)
+            if match is None:
+                continue
+            codepoint_id = hex2id(match.group(1))
+            assert codepoint_id is not None
+            if codepoint_id > 0x10FFFF:
+                continue
+            names.append((codepoint_id, match.group(2)))
+    return names
+
+
+def parse_wikipedia(file_name: str) -> typing.List[typing.Tuple[int, str]]:
+    # returns the (first codepoint of block, wikipedia url) pairs
+    urls = []
+    with open(file_name, encoding="utf-8") as wikipedia_file:
+        rx1 = re.compile(r'^<td data-sort-value=".*">U\+([0-9A-Fa-f]{4,6})\.\.U\+([0-9A-Fa-f]{4,6})</td>')
+        rx2 = re.compile(r'^<td><a href="([^"]*)".*title="([^"]*)">')
+        range_from = None
+        for line in wikipedia_file:
+            line = line.strip()
+            if range_from is None:
+                match = rx1.match(line)
+                if match:
+                    range_from = hex2id(match.group(1))
+            else:
+                match = rx2.match(line)
+                if match:
+                    urls.append((range_from, f"https://en.wikipedia.org{match.group(1)}"))
+                range_from = None
+    return urls
@@ -0,0 +1,134 @@
+import concurrent.futures
+import hashlib
+import logging
+import multiprocessing
+import os
+import shutil
+import typing
+
+from flask import Flask
+
+from unicode.fileutil import read_json, write_atomically, write_json
+
+RENDER_MANIFEST = ".render-manifest.json"
+RENDER_CHUNK_SIZE = 256
+
+
+class _Worker:
+    # state of a rendering worker process: the app, with its loaded data, is inherited from the forking main process
+    app: typing.Optional[Flask] = None
+
+
+def _init_worker(app: Flask) -> None:
+    _Worker.app = app
+
+
+def page_file(path: str) -> str:
+    # "/c/0041" -> "c/0041.html", "/sitemap.txt" -> "sitemap.txt"; the server has to map the extensionless links of
+    # the pages to these files (see README.md)
+    file_name = path.lstrip("/")
+    return file_name if os.path.splitext(file_name)[1] else f"{file_name}.html"
+
+
+def base_key(app: Flask, version: str) -> str:
+    # identifies everything all pages depend on: dataset, templates and configuration
+    key = hashlib.sha256(f"{version}\n".encode("utf-8"))
+    for name in ["BASE_URL", "META", "BOTTOM"]:
+        key.update(f"{name}={app.config.get(name)}\n".encode("utf-8"))
+    assert app.template_folder is not None
+    template_dir = os.path.join(app.root_path, app.template_folder)
+    for file_name in sorted(os.listdir(template_dir)):
+        with open(os.path.join(template_dir, file_name), "rb") as f:
+            key.update(f"{file_name}:{hashlib.sha256(f.read()).hexdigest()}\n".encode("utf-8"))
+    return key.hexdigest()
+
+
+def page_key(key: str, *inputs: str) -> str:
+    # extends the base key by page specific inputs
+    page = hashlib.sha256(key.encode("utf-8"))
+    for value in inputs:
+        page.update(f"\n{value}".encode("utf-8"))
+    return page.hexdigest()
+
+
+class StaticRenderer:
+    # Renders pages of the app to files below an output directory, spreading the work over a pool of forked worker
+    # processes. A manifest records the inputs key of each written page: pages with unchanged keys are skipped, files
+    # of pages that no longer exist are removed.
+
+    def __init__(self, app: Flask, out_dir: str) -> None:
+        self._app = app
+        self._out_dir = out_dir
+        self._manifest_file = os.path.join(out_dir, RENDER_MANIFEST)
+
+    def render(self, pages: typing.Dict[str, str], jobs: typing.Optional[int] = None) -> None:
+        # pages: path -> inputs key
+        os.makedirs(self._out_dir, exist_ok=True)
+        manifest = self._read_manifest()
+        todo = [
+            path
+            for path, key in pages.items()
+            if manifest.get(path) != key or not os.path.isfile(os.path.join(self._out_dir, page_file(path)))
+        ]
+        logging.info("rendering %d of %d pages to %s", len(todo), len(pages), self._out_dir)
+
+        chunks = [todo[i : i + RENDER_CHUNK_SIZE] for i in range(0, len(todo), RENDER_CHUNK_SIZE)]
+        written = 0
+        with concurrent.futures.ProcessPoolExecutor(
+            jobs, mp_context=multiprocessing.get_context("fork"), initializer=_init_worker, initargs=(self._app,)
+        ) as executor:
+            for results in executor.map(_render_pages, [self._out_dir] * len(chunks), chunks):
+                for path, status, changed in results:
+                    if status == 200:
+                        manifest[path] = pages[path]
+                        written += 1 if changed else 0
+                    else:
+                        logging.warning("failed to render %s: %d", path, status)
+                        manifest.pop(path, None)
+
+        removed = 0
+        for path in list(manifest):
+            if path not in pages:
+                try:
+                    os.remove(os.path.join(self._out_dir, page_file(path)))
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                del manifest[path]
+        self._write_manifest(manifest)
+
+        assert self._app.static_folder is not None
+        shutil.copytree(self._app.static_folder, os.path.join(self._out_dir, "static"), dirs_exist_ok=True)
+        logging.info("rendered %d pages (%d changed), removed %d pages", len(todo), written, removed)
+
+    def _read_manifest(self) -> typing.Dict[str, str]:
+        return read_json(self._manifest_file, {})
+
+    def _write_manifest(self, manifest: typing.Dict[str, str]) -> None:
+        write_json(self._manifest_file, manifest, sort_keys=True)
+
+
+def _render_pages(out_dir: str, paths: typing.List[str]) -> typing.List[typing.Tuple[str, int, bool]]:
+    # runs in a worker process; returns (path, status, file changed)
+    assert _Worker.app is not None
+    client = _Worker.app.test_client()
+    results = []
+    for path in paths:
+        response = client.get(path)
+        changed = False
+        if response.status_code == 200:
+            changed = _write_if_changed(os.path.join(out_dir, page_file(path)), response.get_data())
+        results.append((path, response.status_code, changed))
+    return results
+
+
+def _write_if_changed(file_name: str, data: bytes) -> bool:
+    # unchanged files keep their modification time, so syncing them to a CDN is cheap
+    try:
+        with open(file_name, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    write_atomically(file_name, data)
+    return True
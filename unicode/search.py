@@ -0,0 +1,188 @@
+import array
+import base64
+import heapq
+import typing
+
+from unicode.store import CodepointStore
+
+# CJK blocks are deprioritized, since their characters have very long descriptive names
+DEPRIORITIZED_BLOCKS = frozenset(
+    [
+        0x2E80,
+        0x2F00,
+        0x31C0,
+        0x3300,
+        0x3400,
+        0x4E00,
+        0xF900,
+        0x20000,
+        0x2A700,
+        0x2B740,
+        0x2B820,
+        0x2F800,
+    ]
+)
+
+
+# (rank, deprioritized, codepoint): search results are ordered by this key
+SearchKey = typing.Tuple[int, int, int]
+
+# typo tolerant search: minimal trigram similarity of a word and a keyword, max. number of words per keyword; the work
+# per query is bounded by the max. number of keywords, their max. length and the max. number of postings per keyword
+FUZZY_MIN_SIMILARITY = 0.3
+FUZZY_MAX_WORDS = 16
+FUZZY_MAX_KEYWORDS = 8
+FUZZY_MAX_KEYWORD_LENGTH = 64
+FUZZY_MAX_POSTINGS = 20000
+
+
+def trigrams(word: str) -> typing.Set[str]:
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def encode_cursor(key: SearchKey) -> str:
+    return base64.urlsafe_b64encode(",".join(str(value) for value in key).encode("ascii")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> SearchKey:
+    try:
+        values = [int(value) for value in base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii").split(",")]
+    except (ValueError, UnicodeError) as error:
+        raise ValueError(f"invalid cursor: {cursor}") from error
+    if len(values) != 3:
+        raise ValueError(f"invalid cursor: {cursor}")
+    return values[0], values[1], values[2]
+
+
+class NameIndex:
+    # Inverted index from the (upper case) words of the codepoint names to the store segments containing them.
+    # Keywords never contain whitespace, so a keyword is a substring of a name iff it is a substring of one of the
+    # name's words: matching is done against the (small) vocabulary instead of all names.
+    # For typo tolerant searches the vocabulary is additionally indexed by trigrams.
+
+    def __init__(self, codepoints: typing.Optional[CodepointStore] = None) -> None:
+        self._from = array.array("I")
+        self._to = array.array("I")
+        self._rank = array.array("I")
+        self._deprioritized = array.array("B")
+        self._postings: typing.Dict[str, array.array] = {}
+        self._words: typing.List[str] = []
+        self._word_trigram_counts = array.array("H")
+        self._trigrams: typing.Dict[str, array.array] = {}
+        if codepoints is None:
+            return
+        names = []
+        for range_from, range_to, block_id, name in codepoints.iter_segments():
+            self._from.append(range_from)
+            self._to.append(range_to)
+            deprioritized = block_id in DEPRIORITIZED_BLOCKS
+            self._rank.append(10 * len(name) if deprioritized else len(name))
+            self._deprioritized.append(1 if deprioritized else 0)
+            names.append(name)
+        # the postings are ordered like the search results, so the best segments of a word come first
+        order = sorted(range(len(names)), key=lambda segment: (self._rank[segment], self._deprioritized[segment]))
+        for segment in order:
+            for word in set(names[segment].upper().split()):
+                postings = self._postings.get(word)
+                if postings is None:
+                    postings = array.array("I")
+                    self._postings[word] = postings
+                postings.append(segment)
+
+        self._words = list(self._postings)
+        for word_id, word in enumerate(self._words):
+            word_trigrams = trigrams(word)
+            self._word_trigram_counts.append(len(word_trigrams))
+            for trigram in word_trigrams:
+                word_ids = self._trigrams.get(trigram)
+                if word_ids is None:
+                    word_ids = array.array("I")
+                    self._trigrams[trigram] = word_ids
+                word_ids.append(word_id)
+
+    def search(
+        self, keywords: typing.List[str], limit: int, after: typing.Optional[SearchKey] = None
+    ) -> typing.Tuple[typing.List[SearchKey], int]:
+        # returns the keys of the best `limit` matches (following `after`) and the total number of matches
+        segments = self._find(keywords)
+        total = sum(self._to[segment] - self._from[segment] + 1 for segment in segments)
+
+        def candidates() -> typing.Iterator[SearchKey]:
+            for segment in segments:
+                rank, deprioritized = self._rank[segment], self._deprioritized[segment]
+                range_from = self._from[segment]
+                if after is not None:
+                    if (rank, deprioritized) < after[:2]:
+                        continue
+                    if (rank, deprioritized) == after[:2]:
+                        range_from = max(range_from, after[2] + 1)
+                # all codepoints of a segment share the same rank, so at most `limit` of them can make it
+                range_to = min(self._to[segment], range_from + limit - 1)
+                for codepoint_id in range(range_from, range_to + 1):
+                    yield rank, deprioritized, codepoint_id
+
+        return heapq.nsmallest(limit, candidates()), total
+
+    def _find(self, keywords: typing.List[str]) -> typing.Sequence[int]:
+        # returns the segments whose names contain all keywords, in codepoint order
+        candidates: typing.Optional[typing.Set[int]] = None
+        # long keywords match fewer words, so they narrow down the candidates fastest
+        for keyword in sorted(keywords, key=len, reverse=True):
+            matches: typing.Set[int] = set()
+            for word, postings in self._postings.items():
+                if keyword in word:
+                    matches.update(postings)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return []
+        return range(len(self._from)) if candidates is None else sorted(candidates)
+
+    def search_fuzzy(self, keywords: typing.List[str], limit: int) -> typing.List[int]:
+        # returns the codepoints of the best `limit` segments containing a word similar to each keyword
+        if not keywords or any(len(keyword) > FUZZY_MAX_KEYWORD_LENGTH for keyword in keywords):
+            return []
+        scores: typing.Dict[int, float] = {}
+        # long keywords are the most selective ones, so they determine the candidates
+        for index, keyword in enumerate(sorted(keywords, key=len, reverse=True)[:FUZZY_MAX_KEYWORDS]):
+            keyword_scores: typing.Dict[int, float] = {}
+            # the words are ordered by similarity and their postings by rank: once the budget is spent, only less
+            # similar words and lower ranked segments are left out
+            budget = FUZZY_MAX_POSTINGS
+            for similarity, word_id in self._similar_words(keyword):
+                postings = self._postings[self._words[word_id]][:budget]
+                budget -= len(postings)
+                for segment in postings:
+                    # after the first keyword, only segments matching all previous keywords remain candidates
+                    if index > 0 and segment not in scores:
+                        continue
+                    keyword_scores[segment] = max(similarity, keyword_scores.get(segment, 0.0))
+                if budget <= 0:
+                    break
+            if index > 0:
+                keyword_scores = {segment: score + scores[segment] for segment, score in keyword_scores.items()}
+            scores = keyword_scores
+            if not scores:
+                return []
+
+        def candidates() -> typing.Iterator[typing.Tuple[float, int, int, int]]:
+            for segment, score in scores.items():
+                range_from = self._from[segment]
+                range_to = min(self._to[segment], range_from + limit - 1)
+                for codepoint_id in range(range_from, range_to + 1):
+                    yield -score, self._rank[segment], self._deprioritized[segment], codepoint_id
+
+        return [candidate[3] for candidate in heapq.nsmallest(limit, candidates())]
+
+    def _similar_words(self, keyword: str) -> typing.List[typing.Tuple[float, int]]:
+        keyword_trigrams = trigrams(keyword)
+        overlaps: typing.Dict[int, int] = {}
+        for trigram in keyword_trigrams:
+            for word_id in self._trigrams.get(trigram, []):
+                overlaps[word_id] = overlaps.get(word_id, 0) + 1
+        similar = []
+        for word_id, overlap in overlaps.items():
+            similarity = overlap / (len(keyword_trigrams) + self._word_trigram_counts[word_id] - overlap)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                similar.append((similarity, word_id))
+        return heapq.nlargest(FUZZY_MAX_WORDS, similar)
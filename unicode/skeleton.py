@@ -0,0 +1,70 @@
+import typing
+import unicodedata
+
+# UTS #39 confusable detection: two strings are confusable if their skeletons are equal, where
+#   skeleton(s) = NFD(map each character of NFD(s) to its prototype)
+# with the prototypes of confusables.txt. Normalization uses the unicodedata of the running Python, which may be of a
+# different unicode version than the data files.
+
+
+class SkeletonTable:
+    # The prototype mapping as str.translate() table, so a skeleton is computed by three C-level passes.
+
+    def __init__(self, prototypes: typing.Iterable[typing.Tuple[int, str]] = ()) -> None:
+        self._table: typing.Dict[int, str] = dict(prototypes)
+        # ASCII text is NFD already; if the prototypes of ASCII characters are NFD as well, so is its skeleton
+        self._ascii_fast_path = all(
+            unicodedata.is_normalized("NFD", self._table[codepoint_id])
+            for codepoint_id in range(128)
+            if codepoint_id in self._table
+        )
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def prototype(self, codepoint_id: int) -> typing.Optional[str]:
+        return self._table.get(codepoint_id)
+
+    def skeleton(self, text: str) -> str:
+        if self._ascii_fast_path and text.isascii():
+            return text.translate(self._table)
+        return unicodedata.normalize("NFD", unicodedata.normalize("NFD", text).translate(self._table))
+
+    def skeletons(self, texts: typing.Iterable[str]) -> typing.List[str]:
+        skeleton = self.skeleton
+        return [skeleton(text) for text in texts]
+
+    def confusable(self, text1: str, text2: str) -> bool:
+        return self.skeleton(text1) == self.skeleton(text2)
+
+
+class Watchlist:
+    # Protected strings indexed by skeleton: an input is checked with a single hash lookup of its skeleton instead of
+    # being compared to every entry.
+
+    def __init__(self, table: SkeletonTable, entries: typing.Iterable[str] = ()) -> None:
+        self._table = table
+        self._index: typing.Dict[str, typing.List[str]] = {}
+        for entry in entries:
+            self.add(entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._index.values())
+
+    def add(self, entry: str) -> None:
+        entries = self._index.setdefault(self._table.skeleton(entry), [])
+        if entry not in entries:
+            entries.append(entry)
+
+    def matches(self, text: str) -> typing.List[str]:
+        # the entries `text` is confusable with (including `text` itself, if it is an entry)
+        return list(self._index.get(self._table.skeleton(text), ()))
+
+    def screen(self, texts: typing.Iterable[str]) -> typing.List[typing.Tuple[str, typing.List[str]]]:
+        # (text, matching entries) for all texts confusable with an entry
+        results = []
+        for text in texts:
+            entries = self._index.get(self._table.skeleton(text))
+            if entries:
+                results.append((text, list(entries)))
+        return results
@@ -0,0 +1,77 @@
+import gc
+import hashlib
+import logging
+import os
+import pickle
+import typing
+
+from unicode.download import (
+    BLOCKS_TARGET,
+    CASEFOLDING_TARGET,
+    CONFUSABLES_TARGET,
+    DOWNLOAD_MANIFEST_TARGET,
+    HANGUL_TARGET,
+    NAMESLIST_TARGET,
+    UNICODE,
+    UNIHAN_TARGET,
+    WIKIPEDIA_TARGET,
+    cached_sha256,
+)
+from unicode.fileutil import atomic_file, read_json
+
+# bump this whenever the pickled model changes in an incompatible way
+SNAPSHOT_FORMAT = 16
+SNAPSHOT_MAGIC = b"UNICODE-EXPLORER-SNAPSHOT\n"
+SNAPSHOT_TARGET = "uinfo.snapshot"
+
+SOURCE_FILES = [
+    BLOCKS_TARGET,
+    NAMESLIST_TARGET,
+    CONFUSABLES_TARGET,
+    CASEFOLDING_TARGET,
+    UNIHAN_TARGET,
+    HANGUL_TARGET,
+    WIKIPEDIA_TARGET,
+]
+
+
+def source_key(cache_dir: str, unicode_version: str = UNICODE) -> str:
+    # the files are only hashed if they changed since the download manifest has been written
+    manifest: typing.Dict[str, typing.Any] = read_json(os.path.join(cache_dir, DOWNLOAD_MANIFEST_TARGET), {})
+    key = hashlib.sha256(f"{SNAPSHOT_FORMAT}:{unicode_version}".encode("utf-8"))
+    for file_name in SOURCE_FILES:
+        path = os.path.join(cache_dir, file_name)
+        key.update(f"\n{file_name}:".encode("utf-8"))
+        key.update((cached_sha256(path, manifest.get(file_name)) if os.path.isfile(path) else "-").encode("utf-8"))
+    return key.hexdigest()
+
+
+def write_snapshot(file_name: str, key: str, payload: typing.Any) -> None:
+    with atomic_file(file_name) as f:
+        f.write(SNAPSHOT_MAGIC)
+        pickle.dump({"format": SNAPSHOT_FORMAT, "key": key}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def read_snapshot(file_name: str, key: str) -> typing.Optional[typing.Any]:
+    if not os.path.isfile(file_name):
+        logging.info("no snapshot: %s", file_name)
+        return None
+    try:
+        with open(file_name, "rb") as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                logging.warning("bad snapshot: %s", file_name)
+                return None
+            header = pickle.load(f)
+            if header.get("format") != SNAPSHOT_FORMAT or header.get("key") != key:
+                logging.info("stale snapshot: %s", file_name)
+                return None
+            # the model consists of many small objects; the cyclic gc would only slow down unpickling
+            gc.disable()
+            try:
+                return pickle.load(f)
+            finally:
+                gc.enable()
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as error:
+        logging.warning("failed to read snapshot %s: %s", file_name, error)
+        return None
@@ -0,0 +1,338 @@
+import array
+import bisect
+import typing
+
+from unicode.block import IntervalIndex
+from unicode.codepoint import Codepoint, CodepointInfo
+
+
+class PackedStrings:
+    def __init__(self, strings: typing.Iterable[str]) -> None:
+        self._offsets = array.array("I", [0])
+        chunks = []
+        offset = 0
+        for string in strings:
+            chunk = string.encode("utf-8")
+            chunks.append(chunk)
+            offset += len(chunk)
+            self._offsets.append(offset)
+        self._data = b"".join(chunks)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self._data[self._offsets[index] : self._offsets[index + 1]].decode("utf-8")
+
+    def __iter__(self) -> typing.Iterator[str]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+class PackedIntLists:
+    def __init__(self, lists: typing.Iterable[typing.Sequence[int]]) -> None:
+        self._starts = array.array("I", [0])
+        self._items = array.array("i")
+        for items in lists:
+            self._items.extend(items)
+            self._starts.append(len(self._items))
+
+    def __len__(self) -> int:
+        return len(self._starts) - 1
+
+    def __getitem__(self, index: int) -> typing.List[int]:
+        return self._items[self._starts[index] : self._starts[index + 1]].tolist()
+
+
+class PackedStringLists:
+    def __init__(self, lists: typing.Iterable[typing.Sequence[str]]) -> None:
+        self._starts = array.array("I", [0])
+        items: typing.List[str] = []
+        for strings in lists:
+            items.extend(strings)
+            self._starts.append(len(items))
+        self._items = PackedStrings(items)
+
+    def __len__(self) -> int:
+        return len(self._starts) - 1
+
+    def __getitem__(self, index: int) -> typing.List[str]:
+        return [self._items[i] for i in range(self._starts[index], self._starts[index + 1])]
+
+
+class PackedIntListLists:
+    def __init__(self, lists: typing.Iterable[typing.Sequence[typing.Sequence[int]]]) -> None:
+        self._starts = array.array("I", [0])
+        groups: typing.List[typing.Sequence[int]] = []
+        for group_list in lists:
+            groups.extend(group_list)
+            self._starts.append(len(groups))
+        self._groups = PackedIntLists(groups)
+
+    def __len__(self) -> int:
+        return len(self._starts) - 1
+
+    def __getitem__(self, index: int) -> typing.List[typing.List[int]]:
+        return [self._groups[i] for i in range(self._starts[index], self._starts[index + 1])]
+
+
+# name, alternate, comments, related, confusables, combinables
+RowDataT = typing.Tuple[
+    str, typing.List[str], typing.List[str], typing.List[int], typing.List[int], typing.List[typing.List[int]]
+]
+
+
+def _optional(value: int) -> typing.Optional[int]:
+    return None if value < 0 else value
+
+
+def _record_data(record: Codepoint) -> RowDataT:
+    return (
+        record.name(),
+        record.alternate,
+        record.comments,
+        record.related,
+        record.confusables,
+        record.combinables,
+    )
+
+
+class _RowColumns:
+    # the data of the rows, one packed column per field of RowDataT
+
+    def __init__(self, records: typing.Sequence[Codepoint]) -> None:
+        self.names = PackedStrings(r.name() for r in records)
+        self.alternate = PackedStringLists(r.alternate for r in records)
+        self.comments = PackedStringLists(r.comments for r in records)
+        self.related = PackedIntLists(r.related for r in records)
+        self.confusables = PackedIntLists(r.confusables for r in records)
+        self.combinables = PackedIntListLists(r.combinables for r in records)
+
+    def __getitem__(self, index: int) -> RowDataT:
+        return (
+            self.names[index],
+            self.alternate[index],
+            self.comments[index],
+            self.related[index],
+            self.confusables[index],
+            self.combinables[index],
+        )
+
+
+class CodepointStore:
+    # Compact, column-oriented storage of all codepoints that belong to a block. Codepoints with actual data (name,
+    # comments, ...) are stored as "rows"; the remaining ones are combined into ranges of unassigned codepoints within
+    # the same block. Codepoint/CodepointInfo objects are only created on access.
+    # A store of another unicode version can be built on top of a base store: rows whose data (name, comments,
+    # relations, ...) equal the base's rows are not stored again, only the changed rows are.
+
+    UNASSIGNED = "<unassigned>"
+
+    def __init__(
+        self,
+        blocks: typing.Optional[IntervalIndex] = None,
+        records: typing.Optional[typing.Mapping[int, Codepoint]] = None,
+        base: typing.Optional["CodepointStore"] = None,
+    ) -> None:
+        records = records or {}
+        self._blocks = blocks or IntervalIndex()
+        self._ids = array.array("I", sorted(records))
+        rows = [records[codepoint_id] for codepoint_id in self._ids]
+        self._case = array.array("i", (-1 if r.case is None else r.case for r in rows))
+
+        # with a base, each row maps to its own data (index >= 0) or to the base's row `-index - 1`
+        self._base = base
+        self._source = array.array("i")
+        own_rows = rows
+        if base is not None:
+            own_rows = []
+            for record in rows:
+                base_row, _ = base.find(record.codepoint_id())
+                if base_row >= 0 and base.row_data(base_row) == _record_data(record):
+                    self._source.append(-base_row - 1)
+                else:
+                    self._source.append(len(own_rows))
+                    own_rows.append(record)
+        self._columns = _RowColumns(own_rows)
+
+        self._range_from = array.array("I")
+        self._range_to = array.array("I")
+        for _, block_from, block_to in self._blocks:
+            row = bisect.bisect_left(self._ids, block_from)
+            range_from = block_from
+            while row < len(self._ids) and self._ids[row] <= block_to:
+                self._add_range(range_from, self._ids[row] - 1)
+                range_from = self._ids[row] + 1
+                row += 1
+            self._add_range(range_from, block_to)
+
+    def _add_range(self, range_from: int, range_to: int) -> None:
+        if range_from <= range_to:
+            self._range_from.append(range_from)
+            self._range_to.append(range_to)
+
+    def _index(self, row: int) -> int:
+        # index of the data of `row` in the columns of this store; `-base_row - 1` if the base holds it
+        return row if self._base is None else self._source[row]
+
+    def row_data(self, row: int) -> RowDataT:
+        index = self._index(row)
+        if index < 0:
+            assert self._base is not None
+            return self._base.row_data(-index - 1)
+        return self._columns[index]
+
+    def row_name(self, row: int) -> str:
+        index = self._index(row)
+        if index < 0:
+            assert self._base is not None
+            return self._base.row_name(-index - 1)
+        return self._columns.names[index]
+
+    def row_alternates(self, row: int) -> typing.List[str]:
+        index = self._index(row)
+        if index < 0:
+            assert self._base is not None
+            return self._base.row_alternates(-index - 1)
+        return self._columns.alternate[index]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def shared_rows(self) -> int:
+        # number of rows whose data is stored by the base
+        return sum(1 for source in self._source if source < 0)
+
+    def find(self, code: typing.Optional[int]) -> typing.Tuple[int, int]:
+        # returns (row, range) indexes; -1 if not applicable
+        if code is None or code < 0:
+            return -1, -1
+        row = bisect.bisect_left(self._ids, code)
+        if row < len(self._ids) and self._ids[row] == code:
+            return row, -1
+        index = bisect.bisect_right(self._range_from, code) - 1
+        if index >= 0 and code <= self._range_to[index]:
+            return -1, index
+        return -1, -1
+
+    def _prev(self, code: int) -> typing.Optional[int]:
+        candidates = []
+        row = bisect.bisect_left(self._ids, code) - 1
+        if row >= 0:
+            candidates.append(self._ids[row])
+        index = bisect.bisect_left(self._range_from, code) - 1
+        if index >= 0:
+            candidates.append(min(self._range_to[index], code - 1))
+        return max(candidates) if candidates else None
+
+    def _next(self, code: int) -> typing.Optional[int]:
+        candidates = []
+        row = bisect.bisect_right(self._ids, code)
+        if row < len(self._ids):
+            candidates.append(self._ids[row])
+        index = bisect.bisect_right(self._range_from, code) - 1
+        if index >= 0 and self._range_to[index] > code:
+            candidates.append(code + 1)
+        if index + 1 < len(self._range_from):
+            candidates.append(self._range_from[index + 1])
+        return min(candidates) if candidates else None
+
+    def contains(self, code: typing.Optional[int]) -> bool:
+        return self.find(code) != (-1, -1)
+
+    def get(self, code: typing.Optional[int]) -> typing.Optional[Codepoint]:
+        row, index = self.find(code)
+        if row >= 0:
+            name, alternate, comments, related, confusables, combinables = self.row_data(row)
+            codepoint = Codepoint(self._ids[row], name)
+            codepoint.case = _optional(self._case[row])
+            codepoint.alternate = alternate
+            codepoint.comments = comments
+            codepoint.related = related
+            codepoint.confusables = confusables
+            codepoint.combinables = combinables
+        elif index >= 0:
+            assert code is not None
+            codepoint = Codepoint(code, CodepointStore.UNASSIGNED)
+        else:
+            return None
+        codepoint.prev = self._prev(codepoint.codepoint_id())
+        codepoint.next = self._next(codepoint.codepoint_id())
+        return codepoint
+
+    def get_info(self, code: typing.Optional[int]) -> typing.Optional[CodepointInfo]:
+        row, index = self.find(code)
+        if row >= 0:
+            return CodepointInfo(self._ids[row], self.row_name(row))
+        if index >= 0:
+            assert code is not None
+            return CodepointInfo(code, CodepointStore.UNASSIGNED)
+        return None
+
+    def iter_segments(self) -> typing.Iterator[typing.Tuple[int, int, int, str]]:
+        # yields (from, to, block, name) for all rows and ranges in codepoint order
+        row, index = 0, 0
+        block_id, block_to = -1, -1
+        while row < len(self._ids) or index < len(self._range_from):
+            if index >= len(self._range_from) or (row < len(self._ids) and self._ids[row] < self._range_from[index]):
+                segment_from, segment_to, name = self._ids[row], self._ids[row], self.row_name(row)
+                row += 1
+            else:
+                segment_from, segment_to, name = self._range_from[index], self._range_to[index], self.UNASSIGNED
+                index += 1
+            if segment_from > block_to:
+                block = self._blocks.interval(segment_from)
+                assert block is not None
+                block_id, _, block_to = block
+            yield segment_from, segment_to, block_id, name
+
+    def iter_assigned(self) -> typing.Iterator[int]:
+        for row, codepoint_id in enumerate(self._ids):
+            if self.row_name(row) != CodepointStore.UNASSIGNED:
+                yield codepoint_id
+
+    def iter_alternates(self) -> typing.Iterator[typing.Tuple[int, str]]:
+        for row, codepoint_id in enumerate(self._ids):
+            for alternate in self.row_alternates(row):
+                yield codepoint_id, alternate
+
+    def iter_block_ids(self) -> typing.Iterator[int]:
+        for block_id, _, _ in self._blocks:
+            yield block_id
+
+
+class CodepointStoreBuilder:
+    # Mutable staging area used while parsing the data files: blocks are kept as intervals, all other data only for
+    # codepoints that have actually been touched by a loader.
+
+    def __init__(self) -> None:
+        self._blocks = IntervalIndex()
+        self._codepoints: typing.Dict[int, Codepoint] = {}
+
+    def add_block(self, range_from: int, range_to: int) -> None:
+        self._blocks.add(range_from, range_to)
+        for codepoint_id in [
+            codepoint_id for codepoint_id in self._codepoints if range_from <= codepoint_id <= range_to
+        ]:
+            del self._codepoints[codepoint_id]
+
+    def blocks(self) -> IntervalIndex:
+        return self._blocks
+
+    def contains(self, code: typing.Optional[int]) -> bool:
+        return self._blocks.find(code) is not None
+
+    def get(self, code: typing.Optional[int]) -> typing.Optional[Codepoint]:
+        if code is None or not self.contains(code):
+            return None
+        codepoint = self._codepoints.get(code)
+        if codepoint is None:
+            codepoint = Codepoint(code, CodepointStore.UNASSIGNED)
+            self._codepoints[code] = codepoint
+        return codepoint
+
+    def touched(self) -> typing.Iterable[Codepoint]:
+        return self._codepoints.values()
+
+    def build(self, base: typing.Optional[CodepointStore] = None) -> CodepointStore:
+        return CodepointStore(self._blocks, self._codepoints, base)
@@ -0,0 +1,90 @@
+import array
+import bisect
+import heapq
+import typing
+
+from unicode.block import Block
+from unicode.search import DEPRIORITIZED_BLOCKS
+from unicode.store import CodepointStore, PackedStrings
+
+SUGGEST_CODEPOINT = 0
+SUGGEST_ALTERNATE = 1
+SUGGEST_BLOCK = 2
+SUGGEST_KINDS = ["codepoint", "alternate", "block"]
+
+# prefixes matching more entries than this have precomputed results
+SUGGEST_SCAN_LIMIT = 256
+SUGGEST_MAX_RESULTS = 10
+
+
+class SuggestIndex:
+    # Sorted list of all codepoint names, alternate names and block names (upper case), i.e. a flattened prefix trie:
+    # the entries starting with a prefix form a contiguous range that is found by binary search. For prefixes with
+    # large ranges (trie nodes near the root), the best completions are precomputed.
+
+    def __init__(
+        self,
+        codepoints: typing.Optional[CodepointStore] = None,
+        blocks: typing.Optional[typing.Dict[int, Block]] = None,
+    ) -> None:
+        entries: typing.List[typing.Tuple[str, int, str, int, int]] = []
+        if codepoints is not None:
+            for range_from, range_to, block_id, name in codepoints.iter_segments():
+                if range_from == range_to and not name.startswith("<"):
+                    rank = 10 * len(name) if block_id in DEPRIORITIZED_BLOCKS else len(name)
+                    entries.append((name.upper(), rank, name, SUGGEST_CODEPOINT, range_from))
+            for codepoint_id, alternate in codepoints.iter_alternates():
+                entries.append((alternate.upper(), len(alternate), alternate, SUGGEST_ALTERNATE, codepoint_id))
+        if blocks is not None:
+            for block_id, block in blocks.items():
+                # blocks are few, but what users are most likely looking for
+                entries.append((block.name().upper(), 0, block.name(), SUGGEST_BLOCK, block_id))
+        entries.sort()
+
+        self._keys = PackedStrings(entry[0] for entry in entries)
+        self._ranks = array.array("I", (entry[1] for entry in entries))
+        self._texts = PackedStrings(entry[2] for entry in entries)
+        self._kinds = array.array("B", (entry[3] for entry in entries))
+        self._targets = array.array("I", (entry[4] for entry in entries))
+        self._best: typing.Dict[str, array.array] = {}
+        if entries:
+            keys = [entry[0] for entry in entries]
+            self._precompute(keys, 0, len(keys), 0)
+
+    def _precompute(self, keys: typing.List[str], lo: int, hi: int, depth: int) -> typing.List[int]:
+        # returns the best entries of the range [lo, hi) of keys sharing the first `depth` characters
+        if hi - lo <= SUGGEST_SCAN_LIMIT:
+            return self._select(range(lo, hi))
+        candidates = []
+        index = lo
+        while index < hi and len(keys[index]) == depth:
+            candidates.append(index)
+            index += 1
+        while index < hi:
+            child_prefix = keys[index][: depth + 1]
+            child_hi = bisect.bisect_left(keys, child_prefix + "\U0010ffff", index, hi)
+            candidates.extend(self._precompute(keys, index, child_hi, depth + 1))
+            index = child_hi
+        best = self._select(candidates)
+        self._best[keys[lo][:depth]] = array.array("I", best)
+        return best
+
+    def _select(self, entries: typing.Iterable[int]) -> typing.List[int]:
+        # entries are sorted by key, so equal ranks are ordered alphabetically
+        return [entry for _, entry in heapq.nsmallest(SUGGEST_MAX_RESULTS, ((self._ranks[e], e) for e in entries))]
+
+    def suggest(self, prefix: str, limit: int) -> typing.List[typing.Tuple[str, str, int]]:
+        # returns (text, kind, codepoint or block id) of the best `limit` completions of prefix
+        key = prefix.lstrip().upper()
+        if not key:
+            return []
+        lo = bisect.bisect_left(self._keys, key)
+        hi = bisect.bisect_left(self._keys, key + "\U0010ffff", lo)
+        if hi - lo > SUGGEST_SCAN_LIMIT:
+            best: typing.Sequence[int] = self._best[key]
+        else:
+            best = self._select(range(lo, hi))
+        return [
+            (self._texts[entry], SUGGEST_KINDS[self._kinds[entry]], self._targets[entry])
+            for entry in best[: min(limit, SUGGEST_MAX_RESULTS)]
+        ]
@@ -0,0 +1,207 @@
+import concurrent.futures
+import logging
+import re
+import threading
+import time
+import typing
+
+import requests
+import wikipedia  # type: ignore
+
+from unicode.codepoint import code_link
+from unicode.fileutil import read_json, write_json
+from unicode.metrics import WIKIPEDIA_FETCH_FAILURES, WIKIPEDIA_FETCH_SECONDS
+
+WIKIPEDIA_SUMMARIES_TARGET = "wikipedia-summaries.json"
+
+DEFAULT_TTL = 7 * 24 * 3600
+# seconds to wait for all summaries before rendering static pages
+DEFAULT_WAIT = 10 * 60
+RETRY_MIN_DELAY = 60
+RETRY_MAX_DELAY = 24 * 3600
+# seconds per request to the wikipedia API; a fetch takes a few requests
+FETCH_TIMEOUT = 10
+
+
+class _TimeoutRequests:
+    # the wikipedia package has no timeout setting, its requests are made through this stand-in for the requests module
+    @staticmethod
+    def get(url: str, params: typing.Any = None, headers: typing.Any = None) -> requests.Response:
+        return requests.get(url, params=params, headers=headers, timeout=FETCH_TIMEOUT)
+
+
+wikipedia.wikipedia.requests = _TimeoutRequests
+
+
+def set_api_url(api_url: str) -> None:
+    wikipedia.wikipedia.API_URL = api_url
+
+
+def fetch_summary(topic: str) -> str:
+    # the package memoizes summaries for the lifetime of the process, which would defeat refreshing them after the TTL
+    return format_summary(wikipedia.summary.__wrapped__(topic, sentences=3))
+
+
+def format_summary(wikipedia_text: str) -> str:
+    lines = []
+    last_empty = True
+
+    re_h2 = re.compile(r"^== (.*) ==$")
+    re_h3 = re.compile(r"^=== (.*) ===$")
+
+    for line in wikipedia_text.split("\n"):
+        line = line.strip()
+        if not line:
+            if not last_empty:
+                lines.append("")
+            last_empty = True
+            continue
+
+        last_empty = False
+        match = re_h2.match(line)
+        if match:
+            lines.append(f"<b>{match.group(1)}</b>")
+            continue
+        match = re_h3.match(line)
+        if match:
+            lines.append(f"<b>{match.group(1)}</b>")
+            continue
+
+        lines.append(_replace_codepoints_with_links(line))
+    return "<br />\n".join(lines)
+
+
+def _replace_codepoints_with_links(s: str) -> str:
+    re_single_code = re.compile(r"U\+([0-9A-Fa-f]{4,6})\b")
+    re_code_range = re.compile(r"\b([0-9A-Fa-f]{4,6})[-–—]([0-9A-Fa-f]{4,6})\b")
+
+    replacements = []
+    for match in re_single_code.finditer(s):
+        original = match.group(0)
+        code = match.group(1).upper()
+        replacements.append((original, code_link(code)))
+    for match in re_code_range.finditer(s):
+        from_original = match.group(1)
+        to_original = match.group(2)
+        from_code = from_original.upper()
+        to_code = from_original.upper()
+        replacements.append((from_original, code_link(from_code)))
+        replacements.append((to_original, code_link(to_code)))
+    for replacement in replacements:
+        s = s.replace(replacement[0], replacement[1])
+
+    return s
+
+
+class WikipediaSummaries:
+    # Cache of formatted wikipedia summaries, keyed by topic. Lookups never block: missing or expired summaries are
+    # fetched by a background thread pool (an expired summary is served until the new one arrives), failed fetches
+    # are retried with exponential backoff. If a cache file is given, the summaries are persisted there.
+
+    def __init__(
+        self,
+        cache_file: typing.Optional[str] = None,
+        ttl: float = DEFAULT_TTL,
+        fetch: typing.Callable[[str], str] = fetch_summary,
+        workers: int = 4,
+    ) -> None:
+        self._cache_file = cache_file
+        self._ttl = ttl
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._entries: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        self._pending: typing.Dict[str, concurrent.futures.Future] = {}
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wikipedia")
+        if cache_file is not None:
+            self._entries = self._read_cache_file()
+
+    def get(self, topic: str) -> str:
+        with self._lock:
+            entry = self._entries.get(topic)
+            self._schedule(topic, entry)
+        return "" if entry is None else str(entry["summary"])
+
+    def prefetch(self, topics: typing.Iterable[str]) -> None:
+        with self._lock:
+            for topic in topics:
+                self._schedule(topic, self._entries.get(topic))
+
+    def wait(self, timeout: typing.Optional[float] = None) -> bool:
+        # waits at most `timeout` seconds for the pending fetches; returns whether all of them are done
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = list(self._pending.values())
+            if not pending:
+                return True
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            concurrent.futures.wait(pending, remaining)
+
+    def shutdown(self) -> None:
+        # fetches that have not started yet are dropped; running ones, bounded by the request timeout, are waited for,
+        # so no fetch thread holds the lock afterwards (e.g. when the process is forked)
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            self._pending.clear()
+            if self._cache_file is not None:
+                self._write_cache_file()
+
+    def _schedule(self, topic: str, entry: typing.Optional[typing.Dict[str, typing.Any]]) -> None:
+        # requires self._lock
+        now = time.time()
+        if topic in self._pending:
+            return
+        if entry is not None:
+            if entry["failures"] == 0 and now < entry["fetched"] + self._ttl:
+                return
+            if entry["failures"] > 0 and now < entry["retry"]:
+                return
+        try:
+            self._pending[topic] = self._executor.submit(self._update, topic)
+        except RuntimeError:
+            # executor has been shut down
+            pass
+
+    def _update(self, topic: str) -> None:
+        start_time = time.perf_counter()
+        try:
+            summary: typing.Optional[str] = self._fetch(topic)
+        except Exception:  # pylint: disable=broad-except
+            logging.warning("Failed to fetch wikipedia infos for topic %s", topic)
+            WIKIPEDIA_FETCH_FAILURES.inc()
+            summary = None
+        WIKIPEDIA_FETCH_SECONDS.observe(time.perf_counter() - start_time)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(topic, {"summary": "", "fetched": 0.0, "failures": 0, "retry": 0.0})
+            if summary is not None:
+                entry = {"summary": summary, "fetched": now, "failures": 0, "retry": 0.0}
+            else:
+                failures = entry["failures"] + 1
+                delay = min(RETRY_MIN_DELAY * 2 ** (failures - 1), RETRY_MAX_DELAY)
+                entry = dict(entry, failures=failures, retry=now + delay)
+            self._entries[topic] = entry
+            # shutdown() may have dropped the pending fetches already
+            self._pending.pop(topic, None)
+            if self._cache_file is not None and not self._pending:
+                self._write_cache_file()
+
+    def _read_cache_file(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        assert self._cache_file is not None
+        return read_json(self._cache_file, {})
+
+    def _write_cache_file(self) -> None:
+        # requires self._lock; other processes may share the file, so their newer entries are kept
+        assert self._cache_file is not None
+        entries = self._read_cache_file()
+        for topic, entry in self._entries.items():
+            other = entries.get(topic)
+            if other is None or other["fetched"] <= entry["fetched"]:
+                entries[topic] = entry
+        self._entries = entries
+        try:
+            write_json(self._cache_file, entries)
+        except OSError as error:
+            logging.warning("Failed to write wikipedia cache %s: %s", self._cache_file, error)